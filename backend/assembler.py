@@ -1,17 +1,22 @@
 from typing import List, Dict, Optional, Any
 import os
-import subprocess
 from pathlib import Path
 import trimesh
 import numpy as np
 import xml.etree.ElementTree as ET
 from scdatatools.engine.cryxml import etree_from_cryxml_file, etree_from_cryxml_string
+try:
+    from .dae_reader import load_dae_arrays
+except ImportError:
+    from dae_reader import load_dae_arrays
 # from .main import SCManager  # Avoid circular import
 
 class BlueprintAssembler:
     def __init__(self, manager: Any, converter_path: Path):
         self.manager = manager
         self.converter_path = converter_path
+        # Geometry path -> DaeScene decoded in-process (None: needs the converter)
+        self._decoded = {}
         
     def find_blueprint(self, record):
         """Locates the XML definition file for a record."""
@@ -25,13 +30,14 @@ class BlueprintAssembler:
         # record.path implies property available?
         # Use loose search if strict fails
         
+        p4k_index = self.manager.p4k_index
         for path in candidates:
-             if self.manager.sc.p4k.search(path):
+             if p4k_index.exists(path):
                  return path
                  
         # Fallback: Search globally
         print(f"Blueprint: Standard paths failed for {record.name}, searching...")
-        matches = self.manager.sc.p4k.search(f"Data/**/{record.name}.xml")
+        matches = p4k_index.find_basename(f"{record.name}.xml")
         if matches:
             # Filter for Implementations/Xml if possible
             for m in matches:
@@ -45,7 +51,10 @@ class BlueprintAssembler:
         """Parses the XML/CDF file."""
         print(f"Assembler: Parsing Blueprint {file_path}")
         try:
-            with self.manager.sc.p4k.open(file_path) as f:
+            entry = self.manager.p4k_index.get(file_path)
+            if entry is None:
+                raise FileNotFoundError(file_path)
+            with self.manager.p4k_reader.open(entry) as f:
                 # Use scdatatools CryXML parser
                 tree = etree_from_cryxml_file(f)
                 if hasattr(tree, 'getroot'):
@@ -57,21 +66,8 @@ class BlueprintAssembler:
 
     def _resolve_geometry_path(self, item_name: str) -> Optional[str]:
         """Finds the geometry file for a named item (e.g. from hardpoint)."""
-        # Look up item in cache
-        # We need to find the record by NAME
-        found_record = None
-        # This global search is slow, maybe optimize later?
-        # But category_cache is Dict[uid, record].
-        # We need Dict[name, record].
-        # manager._records_by_guid is populated.
-        # But we need by NAME.
-        
-        # Fast lookup if manager supports it, or specific manufacturer lists
-        # For now, iterate cache
-        for r in self.manager._records_by_guid.values():
-            if r.name == item_name:
-                found_record = r
-                break
+        # Look up item record by NAME (manager keeps a name index)
+        found_record = self.manager.get_record_by_name(item_name)
                 
         if not found_record:
             return None
@@ -81,17 +77,16 @@ class BlueprintAssembler:
         # Usually found_record.std_item.geometry or search
         # We can reuse the logic from main.py if we extract it, 
         # or just simple search for CGA/CGF
-        match = self.manager.sc.p4k.search(f"Data/**/{item_name}.cga")
+        match = self.manager.p4k_index.find_basename(f"{item_name}.cga")
         if not match:
-             match = self.manager.sc.p4k.search(f"Data/**/{item_name}.cgf")
+             match = self.manager.p4k_index.find_basename(f"{item_name}.cgf")
              
         if match:
             return match[0].filename
         return None
 
-    def _convert_and_load_part(self, cga_path: str, extract_dir: Path) -> Optional[trimesh.Trimesh]:
-        """Extracts, converts, and loads a part's geometry."""
-        # 1. Extract file
+    def _extract_part(self, cga_path: str, extract_dir: Path) -> Optional[Path]:
+        """Extracts a part's geometry file (if needed) and returns its local path."""
         # Check if already extracted
         local_path = extract_dir / cga_path
         if not local_path.exists():
@@ -109,35 +104,66 @@ class BlueprintAssembler:
                 # So we MUST extract them.
                 
                 # Check P4K
-                 entry = self.manager.sc.p4k.get(cga_path)
+                 entry = self.manager.p4k_index.get(cga_path)
                  if entry:
-                     # Create dir
-                     local_path.parent.mkdir(parents=True, exist_ok=True)
-                     with entry.open() as src, open(local_path, "wb") as dst:
-                         dst.write(src.read())
+                     # Extracted once into the shared store, then linked here
+                     store = self.manager.object_store
+                     store.ensure(self.manager.p4k_reader, entry)
+                     store.materialize(entry, local_path)
                  else:
                      print(f"Assembler: Part file not found in P4K: {cga_path}")
                      return None
             except Exception as e:
                 print(f"Assembler: Error extracting part {cga_path}: {e}")
                 return None
+        return local_path
+
+    def _prepare_parts(self, geom_paths: List[str], extract_dir: Path):
+        """Extracts all parts up front and converts them in batched converter runs."""
+        pending = []
+        for geom_path in dict.fromkeys(geom_paths):
+            self._decoded[geom_path] = self.manager.decode_geometry(geom_path)
+            if self._decoded[geom_path] is not None:
+                continue
+            local_path = self._extract_part(geom_path, extract_dir)
+            if local_path and not local_path.with_suffix(".dae").exists():
+                pending.append(local_path)
+        if pending:
+            print(f"Assembler: Converting {len(pending)} parts")
+            self.manager.convert_parts(pending, extract_dir)
+
+    def _convert_and_load_part(self, cga_path: str, extract_dir: Path) -> Optional[trimesh.Trimesh]:
+        """Extracts, converts, and loads a part's geometry."""
+        # 0. Decoded in-process: nothing to extract or convert
+        if cga_path not in self._decoded:
+            self._decoded[cga_path] = self.manager.decode_geometry(cga_path)
+        scene = self._decoded[cga_path]
+        if scene is not None:
+            vertices, faces = scene.combined()
+            return trimesh.Trimesh(vertices, faces) if len(faces) else None
 
-        # 2. Convert to DAE
+        # 1. Extract file
+        local_path = self._extract_part(cga_path, extract_dir)
+        if local_path is None:
+            return None
+
+        # 2. Convert to DAE (normally already done by _prepare_parts)
         dae_path = local_path.with_suffix(".dae")
         
         if not dae_path.exists():
-            try:
-                subprocess.run([str(self.converter_path), str(local_path), "-o", str(dae_path)], 
-                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            except Exception as e:
-                print(f"Assembler: Error converting part {local_path}: {e}")
+            # Same flags as the main pipeline, so converted parts are shared through the cache
+            result = self.manager.part_converter.convert(local_path, extract_dir)
+            if not result.ok:
+                print(f"Assembler: Error converting part {local_path}: {result.error or 'no DAE produced'}")
                 return None
                 
         # 3. Load DAE
         try:
-            mesh = trimesh.load(dae_path, force='mesh') # Load as single mesh for simplicity?
-            # Or scene?
-            return mesh
+            # Single mesh in the part's own space (bone attachment places it)
+            vertices, faces = load_dae_arrays(dae_path, self.manager.mesh_cache)
+            if not len(faces):
+                return None
+            return trimesh.Trimesh(vertices, faces)
         except Exception as e:
             print(f"Assembler: Error loading DAE {dae_path}: {e}")
             return None
@@ -147,17 +173,15 @@ class BlueprintAssembler:
         Assembles attached parts (Loadouts, Landing Gear) onto the main scene.
         """
         print(f"Assembler: Starting assembly for {record.name}")
+        # (bone, geometry path) pairs, attached once every part has been converted
+        attachments = []
 
         # 1. Processing Landing Gear
         # Naming convention: {ShipName}_LandingSystem
         ls_name = f"{record.name}_LandingSystem"
         print(f"Assembler: Searching for Landing System {ls_name}")
         
-        ls_record = None
-        for r in self.manager._records_by_guid.values():
-            if r.name == ls_name:
-                ls_record = r
-                break
+        ls_record = self.manager.get_record_by_name(ls_name)
         
         if ls_record and hasattr(ls_record, 'properties'):
             gears = ls_record.properties.get('gears', [])
@@ -181,7 +205,7 @@ class BlueprintAssembler:
                     continue
                     
                 print(f"Assembler: Gear {i} Bone='{bone_name}' Path='{geom_path}'")
-                self._attach_component(main_mesh, extract_root, bone_name, geom_path)
+                attachments.append((bone_name, geom_path))
 
         # 2. Processing Default Loadout (Weapons, Seats, etc)
         # Inspect main record components
@@ -244,7 +268,13 @@ class BlueprintAssembler:
                     
                     if item_geo_path:
                         print(f"Assembler: Loadout Item '{entity_class}' -> Port '{port_name}'")
-                        self._attach_component(main_mesh, extract_root, port_name, item_geo_path)
+                        attachments.append((port_name, item_geo_path))
+
+        # Only convert parts whose attachment bone actually exists in the scene
+        attachments = [(bone, str(path)) for bone, path in attachments if bone in main_mesh.graph.nodes]
+        self._prepare_parts([path for _, path in attachments], extract_root)
+        for bone_name, geom_path in attachments:
+            self._attach_component(main_mesh, extract_root, bone_name, geom_path)
 
         return main_mesh
 
@@ -253,11 +283,7 @@ class BlueprintAssembler:
         if not item_name: return None
         
         # 1. Look for record
-        item_record = None
-        for r in self.manager._records_by_guid.values():
-            if r.name == item_name:
-                item_record = r
-                break
+        item_record = self.manager.get_record_by_name(item_name)
         
         if not item_record:
             return None
@@ -269,13 +295,13 @@ class BlueprintAssembler:
         
         # Try direct search first
         patterns = [
-            f"Data/**/{item_name}.cga",
-            f"Data/**/{item_name}.cgf",
-            f"Data/**/{item_name}_lod0.cga" # explicit lod
+            f"{item_name}.cga",
+            f"{item_name}.cgf",
+            f"{item_name}_lod0.cga" # explicit lod
         ]
         
         for p in patterns:
-            matches = self.manager.sc.p4k.search(p)
+            matches = self.manager.p4k_index.find_basename(p)
             if matches:
                 # Filter out 'lod1', 'lod2' etc if parsing specifically
                 # Prefer exact match
@@ -0,0 +1,307 @@
+"""
+StarPrint Catalog Indexes
+In-memory lookup structures built once when game data is loaded, so browsing and
+search requests never have to walk the whole DataCore.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict, defaultdict, namedtuple
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Bump whenever the snapshot layout changes so stale snapshots get rebuilt instead of misread
+SNAPSHOT_VERSION = 5
+
+
+class CatalogEntry:
+    """
+    Lightweight stand-in for a DataCore record: everything browsing and search need, nothing more.
+
+    Type and category strings repeat across thousands of records, so they are interned
+    (also when unpickled from a snapshot) and every entry shares the same string object.
+    """
+    __slots__ = ("guid", "name", "filename", "type", "category")
+
+    def __init__(self, guid: str, name: str, filename: str, type: str, category: str = ""):
+        self.guid = guid
+        self.name = name
+        self.filename = filename
+        self.type = sys.intern(type)
+        self.category = sys.intern(category)   # record directory below libs/foundry/records/
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the shared strings get interned again on load
+        return (CatalogEntry, (self.guid, self.name, self.filename, self.type, self.category))
+
+    def __repr__(self):
+        return f"<CatalogEntry {self.name} {self.guid}>"
+
+
+# Per-record classifier flags, computed once at catalog build time
+RecordClass = namedtuple("RecordClass", [
+    "variants",         # color/skin variant suffixes found in the name
+    "is_variant",       # any variant suffix present (hidden from listings)
+    "is_ai_variant",    # AI/NPC/skin suffix (hidden from manufacturer groups)
+    "is_junk_type",     # blacklisted record type (hidden from search)
+    "is_junk_name",     # NPC_/Dialogue name (hidden from search)
+    "base_name",        # name with _01 / _a numbering stripped (listing dedup key)
+    "manufacturer",     # manufacturer code (name prefix before the first _)
+])
+
+# How many recent queries keep their full match list (for cheap paging and totals).
+# Lists are stored as array('I') (4 bytes per id), so even 1-2 character queries that
+# match most of the catalog stay a few hundred KB each.
+MATCH_CACHE_SIZE = 64
+
+# Anything that isn't a letter or digit separates tokens ("behr_rifle_ballistic_01" -> behr, rifle, ...)
+TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split lowercase text into alphanumeric tokens"""
+    return [t for t in TOKEN_SPLIT.split(text) if t]
+
+
+def trigrams(text: str) -> set:
+    """All 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Token + trigram inverted index over record name, filename and localized label.
+
+    Documents are added in DataCore order, so every posting list is already sorted by
+    doc id and search results come back in the same order the old full scan produced.
+    Queries of 3+ characters intersect trigram posting lists; shorter queries union the
+    posting lists of every token containing the query. Candidates are always verified
+    with a real substring check, so trigram collisions never leak into results.
+    """
+
+    def __init__(self):
+        self._docs: List = []                           # doc id -> caller's object (catalog entry)
+        self._texts: List[Tuple[str, ...]] = []         # doc id -> lowercase searchable fields
+        self._variants: List[Tuple[str, ...]] = []      # doc id -> variant suffixes present in name
+        # partial() instead of a lambda keeps the index picklable for the catalog snapshot
+        self._trigrams: Dict[str, array] = defaultdict(partial(array, "I"))
+        self._tokens: Dict[str, array] = defaultdict(partial(array, "I"))
+        self._init_match_cache()
+
+    def _init_match_cache(self):
+        # Recent query -> matching doc ids, so paging through results doesn't re-run the query
+        self._match_cache: "OrderedDict[str, array]" = OrderedDict()
+        self._match_cache_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_match_cache"], state["_match_cache_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_match_cache()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc, texts: Iterable[str], variants: Tuple[str, ...] = ()):
+        """
+        Add one record to the index.
+
+        Args:
+            doc: Object returned for this record (the caller turns hits into API payloads)
+            texts: Searchable strings (name, filename, label); lowercased here
+            variants: Variant suffixes found in the record name, checked against the query
+        """
+        doc_id = len(self._docs)
+        fields = tuple(t.lower() for t in texts if t)
+        self._docs.append(doc)
+        self._texts.append(fields)
+        self._variants.append(variants)
+
+        grams = set()
+        tokens = set()
+        for field in fields:
+            grams |= trigrams(field)
+            tokens.update(tokenize(field))
+        for gram in grams:
+            self._trigrams[gram].append(doc_id)
+        for token in tokens:
+            self._tokens[token].append(doc_id)
+
+    def _candidates(self, query: str) -> Optional[Iterable[int]]:
+        """Doc ids that may contain query, or None if nothing can match"""
+        if len(query) >= 3:
+            postings = []
+            for gram in trigrams(query):
+                posting = self._trigrams.get(gram)
+                if not posting:
+                    return None
+                postings.append(posting)
+            # Intersect smallest lists first so the working set shrinks fast
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                result.intersection_update(posting)
+                if not result:
+                    return None
+            return sorted(result)
+
+        # Too short for trigrams: look through the token vocabulary instead of the records
+        result = set()
+        for token, posting in self._tokens.items():
+            if query in token:
+                result.update(posting)
+        return sorted(result) if result else None
+
+    def matches(self, query: str) -> Sequence[int]:
+        """All doc ids whose fields contain query, in catalog order (stable across pages), as array('I')"""
+        query = query.lower().strip()
+        if not query:
+            return array("I")
+
+        with self._match_cache_lock:
+            if query in self._match_cache:
+                self._match_cache.move_to_end(query)
+                return self._match_cache[query]
+
+        result = array("I")
+        for doc_id in self._candidates(query) or ():
+            if not any(query in field for field in self._texts[doc_id]):
+                continue
+            # Hide variants unless the query explicitly asks for the variant suffix
+            if any(suffix not in query for suffix in self._variants[doc_id]):
+                continue
+            result.append(doc_id)
+
+        with self._match_cache_lock:
+            self._match_cache[query] = result
+            while len(self._match_cache) > MATCH_CACHE_SIZE:
+                self._match_cache.popitem(last=False)
+        return result
+
+    def count(self, query: str) -> int:
+        """Total number of results for query"""
+        return len(self.matches(query))
+
+    def search(self, query: str, offset: int = 0, limit: Optional[int] = 200) -> List:
+        """Return one page of docs for query"""
+        end = None if limit is None else offset + limit
+        return [self._docs[doc_id] for doc_id in self.matches(query)[offset:end]]
+
+
+class PathNode:
+    """One directory in the category trie"""
+    __slots__ = ("children", "entries", "items")
+
+    def __init__(self):
+        self.children: Dict[str, "PathNode"] = {}
+        self.entries: List = []     # records directly in this directory
+        self.items: List = []       # deduplicated records of the whole subtree (filled by aggregate)
+
+
+class PathTrie:
+    """
+    Prefix tree of DataCore record directories.
+
+    Every node carries the pre-aggregated, deduplicated item list of its subtree, so
+    listing a category or building its part of the sidebar tree only touches the
+    requested subtree instead of every directory in the catalog.
+    """
+
+    def __init__(self):
+        self.root = PathNode()
+
+    def insert(self, dir_path: str, entry):
+        """Add a record under its directory path ("a/b/c")"""
+        node = self.root
+        for part in dir_path.split("/"):
+            if part:
+                node = node.children.setdefault(part, PathNode())
+        node.entries.append(entry)
+
+    def find(self, path: str) -> Optional[PathNode]:
+        """Node for a directory path, or None if no record lives at or below it"""
+        node = self.root
+        for part in path.strip("/").split("/"):
+            if part:
+                node = node.children.get(part)
+                if node is None:
+                    return None
+        return node
+
+    def entries_under(self, path: str) -> List:
+        """Every record at or below a directory path (own entries first, then child subtrees)"""
+        node = self.find(path)
+        if node is None:
+            return []
+        result = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            result.extend(node.entries)
+            stack.extend(reversed(list(node.children.values())))
+        return result
+
+    def aggregate(self, dedup_key: Callable):
+        """
+        Fill every node's item list: its own records first, then each child subtree's.
+
+        Args:
+            dedup_key: entry -> hashable key, or None to leave the entry out of listings.
+                       Only the first entry per key is kept within each subtree.
+        """
+        self._aggregate(self.root, dedup_key)
+
+    def _aggregate(self, node: PathNode, dedup_key: Callable) -> List[Tuple]:
+        keyed = [(dedup_key(entry), entry) for entry in node.entries]
+        for child in node.children.values():
+            keyed.extend(self._aggregate(child, dedup_key))
+
+        seen = set()
+        unique = []
+        for key, entry in keyed:
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            unique.append((key, entry))
+        node.items = [entry for _, entry in unique]
+        return unique
+
+
+def snapshot_key(p4k_path: Path, version_label: str) -> str:
+    """Snapshot cache key: changes whenever Data.p4k is patched or the game version changes"""
+    stat = Path(p4k_path).stat()
+    raw = f"{version_label}|{stat.st_size}|{stat.st_mtime_ns}|v{SNAPSHOT_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def save_snapshot(snapshot_path: Path, catalog: Dict):
+    """Write the catalog to disk atomically (a half-written snapshot is never picked up)"""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "catalog": catalog}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path: Path) -> Optional[Dict]:
+    """Read a catalog snapshot, or None if missing, stale or unreadable"""
+    if not snapshot_path.exists():
+        return None
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = pickle.load(f)
+    except Exception as e:
+        print(f"Catalog snapshot unreadable, rebuilding: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    return data.get("catalog")
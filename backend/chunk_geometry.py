@@ -0,0 +1,258 @@
+"""
+StarPrint Chunk Geometry Decoder
+Reads triangle meshes straight out of CryEngine chunk files (.cgf/.cga and their
+.cgfm/.cgam mesh streams) in memory, from P4K bytes, into the same DaeScene the DAE
+reader produces. No extraction, no converter process, no XML.
+
+Covers CrCh 0x746 files: node chunks for the hierarchy, mesh chunks for stream ids and
+bounds, data-stream chunks for positions and indices. Half-float positions are stored
+relative to the mesh bounds and are scaled back the way cgf-converter does. Anything else (#ivo skins, big-endian
+chunks, layouts that don't add up) returns None, and callers fall back to cgf-converter.
+"""
+
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .dae_reader import DaeScene, DaeNode, DaeGeometry
+    from .dependencies import chunk_entries, COMPANION_SUFFIXES
+except ImportError:
+    from dae_reader import DaeScene, DaeNode, DaeGeometry
+    from dependencies import chunk_entries, COMPANION_SUFFIXES
+
+# Chunk types (low 16 bits of the 0xCCCC1xxx family, as stored in 0x746 tables)
+CHUNK_MESH = 0x1000
+CHUNK_NODE = 0x100B
+CHUNK_DATA_STREAM = 0x1016
+
+# Data stream types (ECgfStreamType)
+STREAM_POSITIONS = 0
+STREAM_INDICES = 5
+STREAM_VERTS_UVS = 15   # Packed position + color + UV (P3S_C4B_T2S and friends)
+
+MESH_IS_EMPTY = 0x1
+BIG_ENDIAN_VERSION = 0x8000
+
+# Mesh chunk: 28-byte header, the stream id table, 4 physics ids, then min/max bounds
+MESH_HEADER_SIZE = 28
+MESH_PHYSICS_IDS_SIZE = 16
+
+NODE_NAME_LENGTH = 64
+NO_PARENT = 0xFFFFFFFF
+
+
+class ChunkFile:
+    """Chunk table of one CrCh file: id -> (type, version, data view)"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.chunks: Dict[int, Tuple[int, int, memoryview]] = {}
+        if bytes(self.data[:4]) != b"CrCh":
+            return
+        for chunk_type, version, chunk_id, size, offset in chunk_entries(self.data):
+            if offset + size <= len(self.data):
+                self.chunks[chunk_id] = (chunk_type, version, self.data[offset:offset + size])
+
+    def of_type(self, chunk_type: int):
+        return [(cid, ver, view) for cid, (t, ver, view) in self.chunks.items() if t == chunk_type]
+
+
+def _read_stream(view: memoryview, version: int) -> Optional[Tuple[int, int, int, memoryview]]:
+    """(stream type, count, element size, payload) of a data stream chunk"""
+    if version == 0x800:
+        _, stream_type, count, element_size = struct.unpack_from("<iiii", view, 0)
+        header = 24     # + reserved[2]
+    elif version == 0x801:
+        _, stream_type, _, count, element_size = struct.unpack_from("<iiiii", view, 0)
+        header = 28
+    else:
+        return None
+    if count < 0 or element_size <= 0 or header + count * element_size > len(view):
+        return None
+    return stream_type, count, element_size, view[header:header + count * element_size]
+
+
+def _positions(stream_type: int, count: int, element_size: int, payload) -> Optional[Tuple[np.ndarray, bool]]:
+    """(float32 positions, whether they were half floats) of a position stream"""
+    if stream_type == STREAM_POSITIONS:
+        layouts = {12: ("<f4", 3), 16: ("<f4", 4), 8: ("<f2", 4)}
+    elif stream_type == STREAM_VERTS_UVS:
+        # Position first: three floats (20-byte elements) or three halves (16-byte elements)
+        layouts = {20: ("<f4", 5), 16: ("<f2", 8)}
+    else:
+        return None
+    if element_size not in layouts:
+        return None
+    dtype, per_element = layouts[element_size]
+    values = np.frombuffer(payload, dtype=dtype, count=count * per_element).reshape(count, per_element)
+    return values[:, :3].astype(np.float32), dtype == "<f2"
+
+
+def _scale_to_bounds(vertices: np.ndarray, bounds: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Half-float positions are relative to the mesh bounds: scale by the box's half extent
+    (never below 1 per axis) and move to its center, as cgf-converter does.
+    """
+    lower, upper = bounds
+    scale = np.maximum(np.abs(upper - lower) / 2, 1.0)
+    center = (lower + upper) / 2
+    return (vertices * scale + center).astype(np.float32)
+
+
+def _indices(count: int, element_size: int, payload) -> Optional[np.ndarray]:
+    if element_size not in (2, 4):
+        return None
+    dtype = "<u2" if element_size == 2 else "<u4"
+    return np.frombuffer(payload, dtype=dtype, count=count).astype(np.uint32)
+
+
+def _mesh_streams(view: memoryview, version: int):
+    """
+    (flags, vertex count, index count, {stream type: chunk id}, (min, max) bounds or None)
+    of a mesh chunk
+    """
+    if version not in (0x801, 0x802):
+        return None
+    # 0x801: one stream id per type; 0x802: eight per type (only the first is used)
+    per_type = 1 if version == 0x801 else 8
+    bounds_offset = MESH_HEADER_SIZE + 16 * per_type * 4 + MESH_PHYSICS_IDS_SIZE
+    if len(view) < bounds_offset:
+        return None
+    flags, _, n_verts, n_indices = struct.unpack_from("<iiii", view, 0)
+    ids = struct.unpack_from(f"<{16 * per_type}i", view, MESH_HEADER_SIZE)
+    streams = {t: ids[t * per_type] for t in range(16) if ids[t * per_type] > 0}
+    bounds = None
+    if len(view) >= bounds_offset + 24:
+        box = np.array(struct.unpack_from("<6f", view, bounds_offset), dtype=np.float64)
+        if np.isfinite(box).all():
+            bounds = (box[:3], box[3:])
+    return flags, n_verts, n_indices, streams, bounds
+
+
+def _decode_mesh(mesh_id: int, files) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Positions and triangles of a mesh chunk. Split assets keep an empty mesh chunk in
+    the header file and the real one (same id) with its streams in the companion.
+    """
+    for chunk_file in files:
+        entry = chunk_file.chunks.get(mesh_id)
+        if entry is None or entry[0] != CHUNK_MESH or entry[1] & BIG_ENDIAN_VERSION:
+            continue
+        described = _mesh_streams(entry[2], entry[1])
+        if described is None:
+            return None
+        flags, n_verts, n_indices, streams, bounds = described
+        if flags & MESH_IS_EMPTY or not n_verts or not n_indices:
+            continue
+
+        def stream(stream_type):
+            chunk = chunk_file.chunks.get(streams.get(stream_type, -1))
+            if chunk is None or chunk[0] != CHUNK_DATA_STREAM or chunk[1] & BIG_ENDIAN_VERSION:
+                return None
+            return _read_stream(chunk[2], chunk[1])
+
+        position_stream = stream(STREAM_POSITIONS) or stream(STREAM_VERTS_UVS)
+        index_stream = stream(STREAM_INDICES)
+        if position_stream is None or index_stream is None:
+            return None
+        positions = _positions(*position_stream)
+        indices = _indices(*index_stream[1:])
+        if positions is None or indices is None:
+            return None
+        vertices, half_floats = positions
+        if half_floats:
+            if bounds is None:
+                return None     # Can't place them without the box
+            vertices = _scale_to_bounds(vertices, bounds)
+        if len(vertices) != n_verts or len(indices) != n_indices:
+            return None
+        if len(indices) % 3 or (len(indices) and indices.max() >= len(vertices)):
+            return None
+        return vertices, indices.reshape(-1, 3)
+    return None
+
+
+def decode_chunk_geometry(data, companion=None) -> Optional[DaeScene]:
+    """
+    DaeScene of a CrCh geometry file (plus its companion mesh stream file, if split),
+    or None if the file isn't something this decoder understands.
+    """
+    header = ChunkFile(data)
+    if not header.chunks:
+        return None
+    files = [header]
+    if companion is not None:
+        companion_file = ChunkFile(companion)
+        if companion_file.chunks:
+            files.insert(0, companion_file)
+
+    scene = DaeScene()
+    decoded: Dict[int, Optional[DaeGeometry]] = {}
+
+    def geometry(mesh_id: int, name: str) -> Optional[DaeGeometry]:
+        if mesh_id not in decoded:
+            result = _decode_mesh(mesh_id, files)
+            decoded[mesh_id] = DaeGeometry(f"mesh{mesh_id}", name, *result) if result else None
+            if decoded[mesh_id] is not None:
+                scene.geometries[f"mesh{mesh_id}"] = decoded[mesh_id]
+        return decoded[mesh_id]
+
+    nodes = []
+    for chunk_id, version, view in header.of_type(CHUNK_NODE):
+        if version & BIG_ENDIAN_VERSION or version not in (0x823, 0x824) or len(view) < 148:
+            return None
+        name = bytes(view[:NODE_NAME_LENGTH]).split(b"\0", 1)[0].decode("utf-8", errors="ignore")
+        object_id, parent_id = struct.unpack_from("<II", view, NODE_NAME_LENGTH)
+        # Row-vector matrix, translation in the last row: transpose for column vectors
+        tm = np.array(struct.unpack_from("<16f", view, 84), dtype=np.float64).reshape(4, 4).T
+        nodes.append((chunk_id, name, object_id, parent_id, tm))
+
+    if not nodes:
+        # Plain meshes without a node tree: place every mesh at the origin
+        for mesh_id, _, _ in header.of_type(CHUNK_MESH):
+            geometry(mesh_id, f"mesh{mesh_id}")
+        return scene if scene.geometries else None
+
+    # Parents before children, as DaeScene expects
+    index_of: Dict[int, int] = {}
+    pending = list(nodes)
+    while pending:
+        remaining = []
+        for chunk_id, name, object_id, parent_id, tm in pending:
+            if parent_id != NO_PARENT and parent_id in {n[0] for n in nodes} and parent_id not in index_of:
+                remaining.append((chunk_id, name, object_id, parent_id, tm))
+                continue
+            node = DaeNode(name or f"node{chunk_id}", index_of.get(parent_id))
+            node.matrix = tm
+            index_of[chunk_id] = len(scene.nodes)
+            scene.nodes.append(node)
+            if object_id in header.chunks and header.chunks[object_id][0] == CHUNK_MESH:
+                if geometry(object_id, node.name) is not None:
+                    node.instances.append(("geometry", f"mesh{object_id}"))
+        if len(remaining) == len(pending):
+            return None     # Parent cycle: not a file we understand
+        pending = remaining
+
+    return scene if scene.placements() else None
+
+
+def read_chunk_geometry(p4k, p4k_index, geom_path: str) -> Optional[DaeScene]:
+    """decode_chunk_geometry for an archive path (reads the companion mesh stream too)"""
+    info = p4k_index.get(geom_path)
+    if info is None:
+        return None
+    # Stored entries come back as views into the mapped archive; don't let decoded arrays pin it
+    data = bytes(p4k.read(info))
+    if data[:4] != b"CrCh":
+        return None
+    companion = None
+    lower = info.filename.lower()
+    for suffix, companion_suffix in COMPANION_SUFFIXES.items():
+        if lower.endswith(suffix):
+            companion_info = p4k_index.get(info.filename[:-len(suffix)] + companion_suffix)
+            if companion_info is not None:
+                companion = bytes(p4k.read(companion_info))
+            break
+    return decode_chunk_geometry(data, companion)
@@ -0,0 +1,394 @@
+"""
+StarPrint Converter
+Runs cgf-converter on extracted parts, several at a time, with output cached once per
+unique source part. Cache keys cover the part's archive identity (path + CRC + size of
+the geometry and its mesh stream), the converter binary and its flags, so a part shared
+by many items (landing gear, weapons) - or unchanged between game builds - goes through
+the converter only once.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .object_store import object_key, link_file
+    from .dependencies import COMPANION_SUFFIXES
+except ImportError:
+    from object_store import object_key, link_file
+    from dependencies import COMPANION_SUFFIXES
+
+# Collada for SC 4.5 compatibility; -notex keeps the converter away from textures entirely
+CONVERTER_DAE_FLAGS = ("-dae", "-notex")
+
+# Converter output below this size is an empty/corrupt DAE
+MIN_DAE_SIZE = 100
+
+DEFAULT_TIMEOUT = 300
+
+# A batch gets the single-part timeout plus this much per extra part, up to the ceiling
+# (a hung batch shouldn't hold a worker for timeout x parts)
+BATCH_TIMEOUT_PER_PART = 20
+MAX_BATCH_TIMEOUT = 900
+
+# The converter is single-threaded, so one process per core
+DEFAULT_WORKERS = os.cpu_count() or 4
+
+# cgf-converter accepts any number of input files; batching them saves a process (and
+# .NET runtime) startup per part. Windows caps a command line at 32767 characters.
+MAX_BATCH_FILES = 32
+MAX_COMMAND_CHARS = 24000
+
+
+def converter_version(exe: Path) -> str:
+    """Identity of the converter binary: replacing or updating it invalidates cached output"""
+    try:
+        st = Path(exe).stat()
+        return f"{Path(exe).name}|{st.st_size}|{st.st_mtime_ns}"
+    except OSError:
+        return f"{Path(exe).name}|missing"
+
+
+def source_key(p4k_index, archive_path: str) -> Optional[str]:
+    """
+    Content identity of a part in the archive, or None if it isn't an archive entry.
+
+    Covers the geometry file and its companion mesh stream (.cgam etc.). Material names
+    live in the geometry header, so renaming a material changes the key too; material
+    file contents don't matter with -notex.
+    """
+    info = p4k_index.get(archive_path)
+    if info is None:
+        return None
+    parts = [object_key(info)]
+    lower = info.filename.lower()
+    for suffix, companion in COMPANION_SUFFIXES.items():
+        if lower.endswith(suffix):
+            companion_info = p4k_index.get(info.filename[:-len(suffix)] + companion)
+            if companion_info is not None:
+                parts.append(object_key(companion_info))
+            break
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ConvertedPartCache:
+    """
+    Converted DAEs under root/<ab>/<sha1>.dae, evicted least-recently-used once the
+    total passes max_bytes. Recency is the file mtime (touched on every hit), so it
+    survives restarts without a separate index file.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict] = None  # key -> size, oldest first (scanned lazily)
+        self._total = 0
+
+    def key(self, source: str, version: str, flags) -> str:
+        raw = f"{source}|{version}|{' '.join(flags)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.dae"
+
+    def _scan(self):
+        if self._entries is not None:
+            return
+        found = []
+        if self.root.exists():
+            for path in self.root.glob("*/*.dae"):
+                st = path.stat()
+                found.append((st.st_mtime, path.stem, st.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total = sum(self._entries.values())
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Place the cached output for key at dest. False on a miss."""
+        path = self.path_for(key)
+        with self._lock:
+            self._scan()
+            if key not in self._entries or not path.exists():
+                self._entries.pop(key, None)
+                return False
+            self._entries.move_to_end(key)
+            os.utime(path)
+        # Linked outside the lock (a copy can take a while), so a concurrent store() may
+        # evict the file first: that's just a miss
+        try:
+            link_file(path, dest)
+        except OSError:
+            Path(dest).unlink(missing_ok=True)
+            return False
+        return True
+
+    def store(self, key: str, produced: Path):
+        """Add freshly converted output (copied, so a later rerun in the export dir can't touch it)"""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        shutil.copyfile(produced, tmp)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        with self._lock:
+            self._scan()
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        # Keep at least the newest entry even if it alone exceeds the budget
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            self.path_for(key).unlink(missing_ok=True)
+
+    def size(self) -> int:
+        with self._lock:
+            self._scan()
+            return self._total
+
+
+class ConversionResult:
+    """Outcome of converting one part"""
+
+    def __init__(self, source: Path):
+        self.source = source
+        self.dae: Optional[Path] = None
+        self.cached = False
+        self.returncode: Optional[int] = None
+        self.stdout = ""
+        self.stderr = ""
+        self.error: Optional[str] = None
+        self.seconds = 0.0
+        self.batch = 1  # Parts converted by the same process (seconds is this part's share)
+
+    @property
+    def ok(self) -> bool:
+        return self.dae is not None
+
+
+class PartConverter:
+    """
+    Runs cgf-converter on extracted parts, consulting the ConvertedPartCache first.
+
+    Parts are expected below objectdir at their archive paths (how every export lays
+    them out), which is how they are mapped back to archive entries for the cache key.
+    """
+
+    def __init__(self, exe, cache: Optional[ConvertedPartCache] = None, p4k_index=None,
+                 flags=CONVERTER_DAE_FLAGS, timeout: int = DEFAULT_TIMEOUT):
+        # exe may also be a command prefix, e.g. [python, stand_in.py] in dev scripts
+        self.command = [str(x) for x in exe] if isinstance(exe, (list, tuple)) else [str(exe)]
+        self.cache = cache
+        self.p4k_index = p4k_index
+        self.flags = tuple(flags)
+        self.timeout = timeout
+        self.version = converter_version(Path(self.command[-1]))
+
+    def cache_key(self, src_file: Path, objectdir: Path) -> Optional[str]:
+        if self.cache is None or self.p4k_index is None:
+            return None
+        try:
+            archive_path = Path(src_file).relative_to(objectdir).as_posix()
+        except ValueError:
+            return None
+        source = source_key(self.p4k_index, archive_path)
+        return self.cache.key(source, self.version, self.flags) if source else None
+
+    def convert(self, src_file: Path, objectdir: Path) -> ConversionResult:
+        """
+        Convert src_file to a .dae next to it (from the cache when possible).
+        result.error is set if the converter failed; result.dae stays None if it
+        succeeded but left no usable DAE where expected.
+        """
+        src_file = Path(src_file)
+        result = ConversionResult(src_file)
+        start = time.perf_counter()
+        dae_file = src_file.with_suffix(".dae")
+
+        key = self.cache_key(src_file, objectdir)
+        if key and self.cache.fetch(key, dae_file):
+            result.dae = dae_file
+            result.cached = True
+            result.seconds = time.perf_counter() - start
+            return result
+
+        cmd = [*self.command, str(src_file), *self.flags, "-objectdir", str(objectdir)]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout, check=False)
+            result.returncode = proc.returncode
+            result.stdout = proc.stdout
+            result.stderr = proc.stderr
+            if proc.returncode != 0:
+                result.error = f"Converter failed with code {proc.returncode}"
+            elif dae_file.exists() and dae_file.stat().st_size >= MIN_DAE_SIZE:
+                result.dae = dae_file
+                if key:
+                    self.cache.store(key, dae_file)
+        except subprocess.TimeoutExpired:
+            result.error = f"Conversion timed out after {self.timeout}s"
+        except Exception as e:
+            result.error = str(e)
+
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def batch_timeout(self, parts: int) -> float:
+        """Seconds a converter run over this many parts may take"""
+        return min(self.timeout + BATCH_TIMEOUT_PER_PART * (parts - 1), max(self.timeout, MAX_BATCH_TIMEOUT))
+
+    def convert_batch(self, sources, objectdir: Path):
+        """
+        Convert several parts with one converter process. Returns {source path: ConversionResult}.
+
+        Cache hits are served first. Parts the run left a complete DAE for are kept even
+        if it failed or timed out later on; every other part is retried with its own process.
+        """
+        results = {}
+        pending = []
+        for src_file in sources:
+            src_file = Path(src_file)
+            key = self.cache_key(src_file, objectdir)
+            if key and self.cache.fetch(key, src_file.with_suffix(".dae")):
+                result = ConversionResult(src_file)
+                result.dae = src_file.with_suffix(".dae")
+                result.cached = True
+                results[src_file] = result
+            else:
+                pending.append((src_file, key))
+
+        if len(pending) == 1:
+            src_file, _ = pending[0]
+            results[src_file] = self.convert(src_file, objectdir)
+            return results
+        if not pending:
+            return results
+
+        for src_file, _ in pending:
+            # Anything left over from an earlier run would look like batch output
+            src_file.with_suffix(".dae").unlink(missing_ok=True)
+
+        start = time.perf_counter()
+        timeout = self.batch_timeout(len(pending))
+        cmd = [*self.command, *(str(src) for src, _ in pending), *self.flags, "-objectdir", str(objectdir)]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
+            batch_ok = proc.returncode == 0
+            if not batch_ok:
+                print(f"Converter batch of {len(pending)} failed with code {proc.returncode}, "
+                      f"retrying the parts it didn't finish one by one")
+        except subprocess.TimeoutExpired:
+            batch_ok = False
+            print(f"Converter batch of {len(pending)} timed out after {timeout}s, "
+                  f"retrying the parts it didn't finish one by one")
+        share = (time.perf_counter() - start) / len(pending)
+
+        for src_file, key in pending:
+            dae_file = src_file.with_suffix(".dae")
+            if _usable_dae(dae_file, complete=not batch_ok):
+                result = ConversionResult(src_file)
+                result.dae = dae_file
+                result.returncode = 0
+                result.seconds = share
+                result.batch = len(pending)
+                if key:
+                    self.cache.store(key, dae_file)
+            else:
+                result = self.convert(src_file, objectdir)
+                result.seconds += share
+            results[src_file] = result
+        return results
+
+
+def _usable_dae(dae_file: Path, complete: bool = False) -> bool:
+    """
+    Is there real converter output at dae_file. With complete, it must also end in the
+    closing COLLADA tag: a run killed mid-write leaves a truncated file behind.
+    """
+    try:
+        size = dae_file.stat().st_size
+        if size < MIN_DAE_SIZE:
+            return False
+        if not complete:
+            return True
+        with open(dae_file, "rb") as f:
+            f.seek(max(0, size - 256))
+            return b"</COLLADA>" in f.read()
+    except OSError:
+        return False
+
+
+def plan_batches(sources, workers: int = DEFAULT_WORKERS, batch_size: int = MAX_BATCH_FILES):
+    """
+    Split sources into converter batches: small enough that every worker gets one,
+    and short enough to fit on a command line.
+    """
+    sources = list(sources)
+    if not sources:
+        return []
+    per_batch = max(1, min(batch_size, -(-len(sources) // max(1, workers))))
+    batches = []
+    current, chars = [], 0
+    for src in sources:
+        length = len(str(src)) + 3
+        if current and (len(current) >= per_batch or chars + length > MAX_COMMAND_CHARS):
+            batches.append(current)
+            current, chars = [], 0
+        current.append(src)
+        chars += length
+    batches.append(current)
+    return batches
+
+
+def convert_parts(converter: PartConverter, sources, objectdir: Path, workers: int = DEFAULT_WORKERS,
+                  batch_size: int = MAX_BATCH_FILES):
+    """
+    Convert many parts concurrently. Returns {source path: ConversionResult}.
+
+    Parts are grouped into batches (one converter process each, see plan_batches) and
+    the batches run on a thread pool. A batch run is bounded by PartConverter.batch_timeout
+    (at most MAX_BATCH_TIMEOUT); parts retried on their own get the converter's timeout each.
+    """
+    unique = list(dict.fromkeys(Path(s) for s in sources))
+    results = {}
+    batches = plan_batches(unique, workers, batch_size)
+    if not batches:
+        return results
+    with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        futures = {pool.submit(converter.convert_batch, batch, objectdir): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                results.update(future.result())
+            except Exception as e:
+                for src in futures[future]:
+                    result = ConversionResult(src)
+                    result.error = str(e)
+                    results[src] = result
+    return results
+
+
+def conversion_summary(results, seconds: float):
+    """Counts and per-part timings (slowest first) of a convert_parts run"""
+    values = list(results.values())
+    return {
+        "parts": len(values),
+        "converted": sum(1 for r in values if r.ok and not r.cached),
+        "cached": sum(1 for r in values if r.cached),
+        "failed": sum(1 for r in values if not r.ok),
+        "seconds": round(seconds, 3),
+        "cpu_seconds": round(sum(r.seconds for r in values), 3),
+        "batched": sum(1 for r in values if r.batch > 1),
+        "timings": [
+            {"part": r.source.name, "seconds": round(r.seconds, 3), "cached": r.cached, "ok": r.ok, "batch": r.batch}
+            for r in sorted(values, key=lambda r: r.seconds, reverse=True)
+        ],
+    }
@@ -0,0 +1,435 @@
+"""
+StarPrint Collada Reader
+Geometry-only reader for cgf-converter's DAE output. It iterparses the file and keeps
+just library_geometries, library_controllers (to find a skin's mesh) and the
+visual_scene node tree, decoding vertex/index lists straight into numpy arrays.
+
+Materials, effects and images are dropped as they stream past. pycollada builds full
+object graphs for those (and chokes on the malformed ones cgf-converter sometimes
+writes, see dev_scripts/test_dae_strip.py); printing only needs the triangles.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Libraries that never contribute geometry; their elements are freed as soon as they close
+SKIPPED_LIBRARIES = {
+    "library_images", "library_materials", "library_effects",
+    "library_lights", "library_cameras", "library_animations",
+}
+
+
+def _tag(elem) -> str:
+    return elem.tag.rsplit("}", 1)[-1]
+
+
+def _child(elem, name: str):
+    for child in elem:
+        if _tag(child) == name:
+            return child
+    return None
+
+
+def _children(elem, name: str):
+    return [child for child in elem if _tag(child) == name]
+
+
+def _numbers(text: Optional[str], dtype) -> np.ndarray:
+    # Text-mode fromstring parses whitespace-separated numbers in C, without a Python list
+    return np.fromstring(text or "", dtype=dtype, sep=" ")
+
+
+def _matrix(text: Optional[str]) -> np.ndarray:
+    values = _numbers(text, np.float64)
+    if values.size != 16:
+        return np.eye(4)
+    return values.reshape(4, 4)
+
+
+def _rotation(axis_angle: np.ndarray) -> np.ndarray:
+    x, y, z, degrees = axis_angle
+    axis = np.array([x, y, z], dtype=np.float64)
+    norm = np.linalg.norm(axis)
+    result = np.eye(4)
+    if norm == 0:
+        return result
+    x, y, z = axis / norm
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    t = 1 - c
+    result[:3, :3] = [
+        [t * x * x + c, t * x * y - s * z, t * x * z + s * y],
+        [t * x * y + s * z, t * y * y + c, t * y * z - s * x],
+        [t * x * z - s * y, t * y * z + s * x, t * z * z + c],
+    ]
+    return result
+
+
+def _node_transform(elem) -> Optional[np.ndarray]:
+    """Local matrix from one <matrix>/<translate>/<rotate>/<scale> element"""
+    tag = _tag(elem)
+    if tag == "matrix":
+        return _matrix(elem.text)
+    values = _numbers(elem.text, np.float64)
+    if tag == "translate" and values.size == 3:
+        result = np.eye(4)
+        result[:3, 3] = values
+        return result
+    if tag == "scale" and values.size == 3:
+        return np.diag([*values, 1.0])
+    if tag == "rotate" and values.size == 4:
+        return _rotation(values)
+    return None
+
+
+class DaeGeometry:
+    """One <geometry>: positions and triangle indices (all primitives merged)"""
+
+    def __init__(self, geometry_id: str, name: str, vertices: np.ndarray, faces: np.ndarray):
+        self.id = geometry_id
+        self.name = name
+        self.vertices = vertices    # float32 (n, 3)
+        self.faces = faces          # uint32 (m, 3)
+
+
+class DaeNode:
+    """One visual_scene <node>; parents always come before their children"""
+
+    def __init__(self, name: str, parent: Optional[int]):
+        self.name = name
+        self.parent = parent
+        self.matrix = np.eye(4)     # Local transform relative to the parent
+        self.instances: List[Tuple[str, str]] = []  # ("geometry" | "controller", id)
+
+
+def _parse_geometry(elem) -> Optional[DaeGeometry]:
+    mesh = _child(elem, "mesh")
+    if mesh is None:
+        return None
+
+    # <vertices> maps its own id onto the POSITION source
+    positions_id = None
+    vertices_id = None
+    vertices_elem = _child(mesh, "vertices")
+    if vertices_elem is not None:
+        vertices_id = vertices_elem.get("id")
+        for inp in _children(vertices_elem, "input"):
+            if inp.get("semantic") == "POSITION":
+                positions_id = inp.get("source", "").lstrip("#")
+
+    # Only the positions are decoded; normal/UV/color sources are never parsed
+    source = next((s for s in _children(mesh, "source") if s.get("id") == positions_id), None)
+    float_array = _child(source, "float_array") if source is not None else None
+    if float_array is None:
+        return None
+    stride = 3
+    technique = _child(source, "technique_common")
+    accessor = _child(technique, "accessor") if technique is not None else None
+    if accessor is not None:
+        stride = int(accessor.get("stride", 3))
+    values = _numbers(float_array.text, np.float32)
+    if stride < 3 or values.size < stride:
+        return None
+    vertices = np.ascontiguousarray(values[:values.size // stride * stride].reshape(-1, stride)[:, :3])
+
+    faces = []
+    for prim in mesh:
+        kind = _tag(prim)
+        if kind not in ("triangles", "polylist", "polygons"):
+            continue
+        inputs = _children(prim, "input")
+        offsets = [int(inp.get("offset", 0)) for inp in inputs]
+        width = max(offsets) + 1 if offsets else 1
+        vertex_offset = 0
+        for inp, offset in zip(inputs, offsets):
+            if inp.get("semantic") == "VERTEX" and inp.get("source", "").lstrip("#") == vertices_id:
+                vertex_offset = offset
+                break
+
+        if kind == "polygons":
+            # One <p> per polygon; rare in converter output
+            polys = [_numbers(p.text, np.int32) for p in _children(prim, "p")]
+            counts = np.array([p.size // width for p in polys], dtype=np.int32)
+            indices = np.concatenate(polys) if polys else np.zeros(0, dtype=np.int32)
+        else:
+            indices = _numbers(_child(prim, "p").text if _child(prim, "p") is not None else "", np.int32)
+            counts = None
+            if kind == "polylist":
+                vcount = _child(prim, "vcount")
+                counts = _numbers(vcount.text if vcount is not None else "", np.int32)
+
+        corners = indices[:indices.size // width * width].reshape(-1, width)[:, vertex_offset]
+        if counts is None or (counts.size and np.all(counts == 3)):
+            tris = corners[:corners.size // 3 * 3].reshape(-1, 3)
+        else:
+            tris = _fan_triangulate(corners, counts)
+        if tris.size:
+            faces.append(tris)
+
+    if faces:
+        faces = np.concatenate(faces)
+        # Drop triangles pointing past the vertex list instead of failing the whole part
+        faces = faces[(faces < len(vertices)).all(axis=1) & (faces >= 0).all(axis=1)]
+    else:
+        faces = np.zeros((0, 3), dtype=np.int32)
+    return DaeGeometry(elem.get("id"), elem.get("name") or elem.get("id"), vertices, faces.astype(np.uint32))
+
+
+def _fan_triangulate(corners: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Triangle fans for polygons of any size, vectorized over all polygons"""
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # Degenerate polygons (< 3 corners) still take up their corners, they just emit nothing
+    keep = counts >= 3
+    starts, counts = starts[keep], counts[keep]
+    if not counts.size:
+        return np.zeros((0, 3), dtype=np.int32)
+    tri_counts = counts - 2
+    first = np.repeat(starts, tri_counts)
+    # Position of each triangle within its polygon: 0..count-3
+    step = np.arange(tri_counts.sum()) - np.repeat(np.cumsum(tri_counts) - tri_counts, tri_counts)
+    return np.stack([corners[first], corners[first + step + 1], corners[first + step + 2]], axis=1)
+
+
+class DaeScene:
+    """Geometry and node tree of a DAE file (see read_dae)"""
+
+    def __init__(self):
+        self.geometries: Dict[str, DaeGeometry] = {}
+        self.controllers: Dict[str, Tuple[str, np.ndarray]] = {}  # id -> (geometry id, bind shape matrix)
+        self.nodes: List[DaeNode] = []
+
+    def world_matrices(self) -> List[np.ndarray]:
+        matrices = []
+        for node in self.nodes:
+            parent = matrices[node.parent] if node.parent is not None else np.eye(4)
+            matrices.append(parent @ node.matrix)
+        return matrices
+
+    def placements(self) -> List[Tuple[Optional[int], DaeGeometry, np.ndarray]]:
+        """
+        (node index, DaeGeometry, bind matrix) for every placed, non-empty geometry.
+        A geometry's world matrix is its node's world matrix times the bind matrix
+        (identity unless it is skinned). Files without a visual scene place their whole
+        geometry library at the origin (node index None).
+        """
+        if not self.nodes:
+            return [(None, g, np.eye(4)) for g in self.geometries.values() if len(g.faces)]
+        placed = []
+        for i, node in enumerate(self.nodes):
+            for kind, ref in node.instances:
+                matrix = np.eye(4)
+                if kind == "controller":
+                    if ref not in self.controllers:
+                        continue
+                    ref, matrix = self.controllers[ref]
+                geometry = self.geometries.get(ref)
+                if geometry is not None and len(geometry.faces):
+                    placed.append((i, geometry, matrix))
+        return placed
+
+    def parts(self):
+        """(name, world-space float32 vertices, uint32 faces) for every placed geometry"""
+        worlds = self.world_matrices()
+        for node_index, geometry, bind in self.placements():
+            if node_index is None:
+                name, matrix = geometry.name, bind
+            else:
+                name, matrix = self.nodes[node_index].name, worlds[node_index] @ bind
+            vertices, faces = geometry.vertices, geometry.faces
+            if not np.allclose(matrix, np.eye(4)):
+                vertices = (vertices @ matrix[:3, :3].T.astype(np.float32)) + matrix[:3, 3].astype(np.float32)
+                if np.linalg.det(matrix[:3, :3]) < 0:
+                    # A mirroring placement turns the triangles inside out; reverse them back
+                    faces = faces[:, ::-1]
+            yield name, vertices, faces
+
+    def counts(self) -> Tuple[int, int]:
+        """(vertices, faces) that parts()/combined() will produce, without building them"""
+        placed = self.placements()
+        return sum(len(g.vertices) for _, g, _ in placed), sum(len(g.faces) for _, g, _ in placed)
+
+    def combined(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every placed geometry in world space, as one vertex and one face array"""
+        vertices, faces, offset = [], [], 0
+        for _, v, f in self.parts():
+            vertices.append(v)
+            faces.append(f + np.uint32(offset))
+            offset += len(v)
+        if not vertices:
+            return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint32)
+        return np.concatenate(vertices), np.concatenate(faces)
+
+    def to_trimesh_scene(self):
+        """
+        trimesh.Scene with the full node tree (so bones can still be looked up by name
+        for attachments) and one mesh per placed geometry.
+        """
+        import trimesh
+
+        scene = trimesh.Scene()
+        base = scene.graph.base_frame
+        names = []
+        for i, node in enumerate(self.nodes):
+            name = node.name
+            if name in names or name == base:
+                name = f"{name}_{i}"
+            names.append(name)
+            parent = names[node.parent] if node.parent is not None else base
+            scene.graph.update(frame_to=name, frame_from=parent, matrix=node.matrix)
+
+        for j, (node_index, geometry, bind) in enumerate(self.placements()):
+            parent = names[node_index] if node_index is not None else base
+            mesh = trimesh.Trimesh(geometry.vertices, geometry.faces,
+                                   metadata={"name": parent if node_index is not None else geometry.name})
+            scene.add_geometry(mesh, geom_name=f"{geometry.name}_{j}", node_name=f"{parent}_mesh{j}",
+                               parent_node_name=parent, transform=bind)
+        return scene
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Flat arrays of the placed geometry and node tree (what the mesh cache stores).
+        Part vertices/faces are concatenated in placement order; faces stay local to their part.
+        """
+        placed = self.placements()
+        vertex_counts = [len(g.vertices) for _, g, _ in placed]
+        face_counts = [len(g.faces) for _, g, _ in placed]
+        return {
+            "node_names": np.array([n.name for n in self.nodes], dtype=str),
+            "node_parents": np.array([-1 if n.parent is None else n.parent for n in self.nodes], dtype=np.int32),
+            "node_matrices": np.array([n.matrix for n in self.nodes], dtype=np.float64).reshape(-1, 4, 4),
+            "part_names": np.array([g.name for _, g, _ in placed], dtype=str),
+            "part_nodes": np.array([-1 if i is None else i for i, _, _ in placed], dtype=np.int32),
+            "part_matrices": np.array([m for _, _, m in placed], dtype=np.float64).reshape(-1, 4, 4),
+            "vertex_offsets": np.concatenate(([0], np.cumsum(vertex_counts, dtype=np.int64))),
+            "face_offsets": np.concatenate(([0], np.cumsum(face_counts, dtype=np.int64))),
+            "vertices": (np.concatenate([g.vertices for _, g, _ in placed]).astype(np.float32, copy=False)
+                         if placed else np.zeros((0, 3), dtype=np.float32)),
+            "faces": (np.concatenate([g.faces for _, g, _ in placed]).astype(np.uint32, copy=False)
+                      if placed else np.zeros((0, 3), dtype=np.uint32)),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "DaeScene":
+        """Rebuild a scene from to_arrays() output; part arrays are views, so memory maps stay mapped"""
+        scene = cls()
+        for name, parent, matrix in zip(arrays["node_names"], arrays["node_parents"], arrays["node_matrices"]):
+            node = DaeNode(str(name), None if parent < 0 else int(parent))
+            node.matrix = np.array(matrix)
+            scene.nodes.append(node)
+
+        v_off, f_off = arrays["vertex_offsets"], arrays["face_offsets"]
+        for j, (name, node_index, matrix) in enumerate(zip(arrays["part_names"], arrays["part_nodes"],
+                                                           arrays["part_matrices"])):
+            geometry_id = f"part{j}"
+            scene.geometries[geometry_id] = DaeGeometry(
+                geometry_id, str(name),
+                arrays["vertices"][v_off[j]:v_off[j + 1]],
+                arrays["faces"][f_off[j]:f_off[j + 1]],
+            )
+            if node_index < 0:
+                continue
+            if np.allclose(matrix, np.eye(4)):
+                scene.nodes[node_index].instances.append(("geometry", geometry_id))
+            else:
+                scene.controllers[geometry_id] = (geometry_id, np.array(matrix))
+                scene.nodes[node_index].instances.append(("controller", geometry_id))
+        return scene
+
+
+def read_dae(path: Path) -> DaeScene:
+    """Stream a DAE file into a DaeScene (geometry + node tree, no materials)"""
+    scene = DaeScene()
+    stack: List[int] = []       # Indices of the currently open <node> elements
+    in_skipped = 0
+    in_scene = False
+
+    for event, elem in ET.iterparse(str(path), events=("start", "end")):
+        tag = _tag(elem)
+        if event == "start":
+            if tag in SKIPPED_LIBRARIES:
+                in_skipped += 1
+            elif tag == "visual_scene":
+                in_scene = True
+            elif tag == "node" and in_scene:
+                node = DaeNode(elem.get("name") or elem.get("id") or f"node_{len(scene.nodes)}",
+                               stack[-1] if stack else None)
+                scene.nodes.append(node)
+                stack.append(len(scene.nodes) - 1)
+            continue
+
+        if in_skipped:
+            if tag in SKIPPED_LIBRARIES:
+                in_skipped -= 1
+                elem.clear()
+            continue
+
+        if tag == "geometry":
+            geometry = _parse_geometry(elem)
+            if geometry is not None:
+                scene.geometries[geometry.id] = geometry
+            elem.clear()
+        elif tag == "controller":
+            skin = _child(elem, "skin")
+            if skin is not None:
+                bind_shape = _child(skin, "bind_shape_matrix")
+                scene.controllers[elem.get("id")] = (
+                    skin.get("source", "").lstrip("#"),
+                    _matrix(bind_shape.text) if bind_shape is not None else np.eye(4),
+                )
+            elem.clear()
+        elif in_scene and stack:
+            node = scene.nodes[stack[-1]]
+            if tag in ("matrix", "translate", "rotate", "scale"):
+                local = _node_transform(elem)
+                if local is not None:
+                    node.matrix = node.matrix @ local
+            elif tag == "instance_geometry":
+                node.instances.append(("geometry", elem.get("url", "").lstrip("#")))
+            elif tag == "instance_controller":
+                node.instances.append(("controller", elem.get("url", "").lstrip("#")))
+            elif tag == "node":
+                stack.pop()
+                elem.clear()
+        elif tag == "visual_scene":
+            in_scene = False
+            elem.clear()
+
+    return scene
+
+
+def load_dae_scene(path: Path, cache=None):
+    """
+    trimesh.Scene of a DAE via read_dae (or the parsed-mesh cache, if given), falling
+    back to trimesh/pycollada if it can't be read
+    """
+    try:
+        return (cache.load(path) if cache is not None else read_dae(path)).to_trimesh_scene()
+    except Exception as e:
+        print(f"Warning: Geometry reader failed on {Path(path).name} ({e}), falling back to trimesh")
+        import trimesh
+        return trimesh.load(path, force='scene')
+
+
+def load_dae_part(path: Path, cache=None) -> DaeScene:
+    """
+    DaeScene of a DAE via read_dae (or the parsed-mesh cache, if given). If it can't be
+    read, trimesh/pycollada's flattened mesh comes back as a single unplaced geometry.
+    """
+    try:
+        return cache.load(path) if cache is not None else read_dae(path)
+    except Exception as e:
+        print(f"Warning: Geometry reader failed on {Path(path).name} ({e}), falling back to trimesh")
+        import trimesh
+        mesh = trimesh.load(path, force='mesh')
+        scene = DaeScene()
+        scene.geometries["mesh"] = DaeGeometry("mesh", Path(path).stem,
+                                               np.asarray(mesh.vertices, dtype=np.float32),
+                                               np.asarray(mesh.faces, dtype=np.uint32))
+        return scene
+
+
+def load_dae_arrays(path: Path, cache=None) -> Tuple[np.ndarray, np.ndarray]:
+    """All placed geometry of a DAE in world space as (float32 vertices, uint32 faces)"""
+    return load_dae_part(path, cache).combined()
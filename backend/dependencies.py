@@ -0,0 +1,120 @@
+"""
+StarPrint Geometry Dependencies
+Works out which archive files cgf-converter actually needs for one geometry file,
+so exports extract that set instead of the geometry's whole directory.
+"""
+
+import struct
+from typing import Dict, List, Optional, Tuple
+
+# Split-out mesh data next to the geometry header file (x.cga -> x.cgam)
+COMPANION_SUFFIXES = {
+    ".cga": ".cgam",
+    ".cgf": ".cgfm",
+    ".skin": ".skinm",
+    ".chr": ".chrm",
+}
+
+# CrCh 0x746 chunk table entries store a 16-bit type (the 0xCCCC0000 family, minus the prefix)
+CHCR_MTL_NAME = 0x1014
+# #ivo 0x900 files (skins, characters) name their material in a dedicated chunk
+IVO_MATERIAL_NAME = 0x8335674E
+
+MTL_NAME_LENGTH = 128
+
+
+def _fixed_string(data: bytes, offset: int, length: int = MTL_NAME_LENGTH) -> str:
+    raw = bytes(data[offset:offset + length])
+    return raw.split(b"\0", 1)[0].decode("utf-8", errors="ignore").strip()
+
+
+def chunk_entries(data) -> List[Tuple[int, int, int, int, int]]:
+    """
+    (type, version, id, size, offset) for every chunk of a CrCh 0x746 or #ivo 0x900 file.
+    #ivo tables carry no ids or sizes: ids are table positions and sizes run to the next chunk.
+    """
+    if len(data) < 16:
+        return []
+    magic = bytes(data[:4])
+    _, count, table_offset = struct.unpack_from("<III", data, 4)
+
+    chunks = []
+    if magic == b"CrCh":
+        # type u16, version u16, id u32, size u32, offset u32
+        for i in range(count):
+            pos = table_offset + i * 16
+            if pos + 16 > len(data):
+                break
+            chunk_type, version, chunk_id, size, offset = struct.unpack_from("<HHIII", data, pos)
+            chunks.append((chunk_type, version, chunk_id, size, offset))
+    elif magic == b"#ivo":
+        # type u32, version u32, offset u64
+        raw = []
+        for i in range(count):
+            pos = table_offset + i * 16
+            if pos + 16 > len(data):
+                break
+            raw.append(struct.unpack_from("<IIQ", data, pos))
+        ends = sorted({offset for _, _, offset in raw} | {len(data)})
+        for i, (chunk_type, version, offset) in enumerate(raw):
+            end = next((e for e in ends if e > offset), len(data))
+            chunks.append((chunk_type, version, i, end - offset, offset))
+    return chunks
+
+
+def chunk_table(data) -> List[Tuple[int, int, int]]:
+    """(type, version, offset) for every chunk of a CrCh 0x746 or #ivo 0x900 file"""
+    return [(chunk_type, version, offset) for chunk_type, version, _, _, offset in chunk_entries(data)]
+
+
+def material_names(data) -> List[str]:
+    """Material paths (relative to Data/, usually without .mtl) referenced by a chunk file"""
+    names = []
+    for chunk_type, _, offset in chunk_table(data):
+        if chunk_type in (CHCR_MTL_NAME, IVO_MATERIAL_NAME):
+            name = _fixed_string(data, offset)
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def geometry_dependencies(p4k, p4k_index, geom_path: str) -> Tuple[List, List[str]]:
+    """
+    Archive entries cgf-converter needs to convert geom_path.
+
+    That is the geometry file, its companion mesh stream (.cgam/.cgfm/.skinm/.chrm)
+    and the material files named in its chunks. Returns (entries, missing paths).
+    """
+    entries: Dict[str, object] = {}
+    missing: List[str] = []
+
+    def add(path: str) -> Optional[object]:
+        info = p4k_index.get(path)
+        if info is None:
+            missing.append(path)
+        else:
+            entries.setdefault(info.filename.lower(), info)
+        return info
+
+    geom_info = add(geom_path)
+    if geom_info is None:
+        return [], missing
+
+    lower = geom_path.lower()
+    for suffix, companion in COMPANION_SUFFIXES.items():
+        if lower.endswith(suffix):
+            # Older assets keep everything in one file, so a missing companion is fine
+            companion_info = p4k_index.get(geom_path[:-len(suffix)] + companion)
+            if companion_info is not None:
+                entries.setdefault(companion_info.filename.lower(), companion_info)
+            break
+
+    try:
+        # Header files are small; with a MappedP4K this is a view into the map, not a copy
+        data = p4k.read(geom_info)
+        for name in material_names(data):
+            add(name if name.lower().endswith(".mtl") else f"{name}.mtl")
+    except Exception as e:
+        print(f"Warning: Could not read material names from {geom_info.filename}: {e}")
+
+    return list(entries.values()), missing
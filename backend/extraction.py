@@ -0,0 +1,135 @@
+"""
+StarPrint P4K Extraction
+Streams archive entries to disk in bounded chunks on a thread pool, so large
+directories extract in parallel and big entries never sit whole in memory.
+"""
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+# Bytes copied per read; bounds memory per worker regardless of entry size
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+# zstd decompression releases the GIL, so a few threads per core keep both disk and CPU busy
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+
+class ExtractionStats:
+    """Totals and throughput of one extraction run"""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0                  # bytes read out of the archive
+        self.reused = 0                 # files served from the object store without touching the archive
+        self.reused_bytes = 0
+        self.failed: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "reused": self.reused,
+            "reused_bytes": self.reused_bytes,
+            "failed": len(self.failed),
+            "seconds": round(self.seconds, 3),
+            "files_per_sec": round(self.files_per_sec, 1),
+            "mb_per_sec": round(self.bytes_per_sec / (1024 * 1024), 2),
+        }
+
+    def __str__(self):
+        return (f"{self.files} files, {self.bytes / (1024 * 1024):.1f} MB in {self.seconds:.2f}s "
+                f"({self.files_per_sec:.0f} files/s, {self.bytes_per_sec / (1024 * 1024):.1f} MB/s)"
+                + (f", {self.reused} reused from store" if self.reused else "")
+                + (f", {len(self.failed)} failed" if self.failed else ""))
+
+
+def extract_entry(p4k, info, dest: Path, chunk_size: int = EXTRACT_CHUNK_SIZE) -> int:
+    """
+    Stream one archive entry to dest. Returns the number of bytes written.
+
+    p4k can be the P4KFile or a MappedP4K; with the latter, stored entries are written
+    straight from the memory map and compressed ones decompress from it.
+
+    Writes to a temporary name first, so an interrupted extraction never leaves a
+    truncated file that later runs would mistake for a finished one.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per thread: two workers may race to store the same object
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.part")
+    view = p4k.stored_view(info) if hasattr(p4k, "stored_view") else None
+    with open(tmp, "wb") as dst:
+        if view is not None:
+            for pos in range(0, len(view), chunk_size):
+                dst.write(view[pos:pos + chunk_size])
+        else:
+            with p4k.open(info) as src:
+                shutil.copyfileobj(src, dst, chunk_size)
+    os.replace(tmp, dest)
+    return info.file_size
+
+
+def _store_and_link(store, p4k, info, dest: Path) -> int:
+    written = store.ensure(p4k, info)
+    store.materialize(info, dest)
+    return written
+
+
+def extract_files(p4k, entries: Iterable, dest_root: Path, workers: Optional[int] = None,
+                  chunk_size: int = EXTRACT_CHUNK_SIZE, skip_existing: bool = False,
+                  store=None) -> ExtractionStats:
+    """
+    Extract archive entries below dest_root, keeping their archive paths.
+
+    Args:
+        p4k: Open P4KFile or MappedP4K (both are safe to read from several threads)
+        entries: P4KInfo entries to extract
+        dest_root: Directory the archive paths are recreated under
+        workers: Thread count (default: DEFAULT_WORKERS)
+        skip_existing: Leave files that already exist with the right size alone
+        store: Optional ObjectStore; entries are extracted into it once and linked into dest_root
+    """
+    stats = ExtractionStats()
+    start = time.perf_counter()
+
+    jobs = []
+    for info in entries:
+        dest = Path(dest_root) / info.filename
+        if skip_existing and dest.exists() and dest.stat().st_size == info.file_size:
+            continue
+        jobs.append((info, dest))
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(workers or DEFAULT_WORKERS, len(jobs))) as pool:
+            if store is not None:
+                futures = {pool.submit(_store_and_link, store, p4k, info, dest): info for info, dest in jobs}
+            else:
+                futures = {pool.submit(extract_entry, p4k, info, dest, chunk_size): info for info, dest in jobs}
+            for future in as_completed(futures):
+                info = futures[future]
+                try:
+                    written = future.result()
+                    stats.bytes += written
+                    stats.files += 1
+                    if store is not None and not written:
+                        stats.reused += 1
+                        stats.reused_bytes += info.file_size
+                except Exception as e:
+                    print(f"Warning: Failed to extract {info.filename}: {e}")
+                    stats.failed.append(info.filename)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
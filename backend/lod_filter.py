@@ -0,0 +1,136 @@
+"""
+StarPrint LOD Filter
+Drops superimposed LODs, proxies and junk from a flattened scene. Candidates are
+considered largest-first; one is dropped as a duplicate when an already-kept mesh has
+nearly the same center and size. Neighbours come from a KD-tree over the mesh centers,
+so only meshes that are actually close get compared.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+MIN_VERTICES = 10          # Below this: physics proxies, locators, buttons
+CENTER_TOLERANCE = 0.01    # Center distance, relative to the larger mesh's diagonal
+SIZE_TOLERANCE = 0.02      # Diagonal difference, relative to the larger mesh's diagonal
+MIN_REFERENCE_SIZE = 0.1   # Floor for the relative tolerances (avoids div/0 on specks)
+
+DROP_NAME_KEYWORDS = ("proxy", "$physics", "_lod")
+KEEP_NAME_KEYWORDS = ("glass", "guts", "interior")
+
+# Overlap pairs listed in the report (the counts always cover everything)
+MAX_REPORTED_OVERLAPS = 50
+
+
+def _contains_any(names: np.ndarray, keywords: Sequence[str]) -> np.ndarray:
+    """Per-name flag: does the (lowercased) name contain any of the keywords"""
+    found = np.zeros(len(names), dtype=bool)
+    for keyword in keywords:
+        found |= np.char.find(names, keyword) >= 0
+    return found
+
+
+def _close_pairs(centers: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index pairs (i < j) whose centers may be within tolerance. Sizes within SIZE_TOLERANCE
+    of each other fall in the same or adjacent power-of-two band, so each band is only
+    searched together with the next one up, at a radius that band pair allows.
+    """
+    reference = np.maximum(sizes, MIN_REFERENCE_SIZE)
+    bands = np.floor(np.log2(reference)).astype(np.int64)
+    found = []
+    for band in np.unique(bands).tolist():
+        members = np.flatnonzero((bands == band) | (bands == band + 1))
+        if len(members) < 2:
+            continue
+        radius = CENTER_TOLERANCE * 2.0 ** (band + 2)
+        pairs = cKDTree(centers[members]).query_pairs(radius, output_type="ndarray")
+        if len(pairs):
+            found.append(members[pairs])
+    if not found:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Pairs inside the upper band turn up twice (with the band below and the one above)
+    pairs = np.concatenate(found)
+    codes = np.unique(pairs[:, 0].astype(np.int64) * len(centers) + pairs[:, 1])
+    return codes // len(centers), codes % len(centers)
+
+
+def filter_lods(names: Sequence[str], vertex_counts: Sequence[int],
+                bounds: np.ndarray) -> Tuple[List[int], Dict[str, Any]]:
+    """
+    Indices of the meshes to keep (largest first) and a report of what was dropped.
+    bounds is (n, 2, 3): per-mesh world-space min/max corners.
+    """
+    n = len(names)
+    vertex_counts = np.asarray(vertex_counts, dtype=np.int64)
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(n, 2, 3)
+    centers = bounds.mean(axis=1)
+    sizes = np.linalg.norm(bounds[:, 1] - bounds[:, 0], axis=1)
+
+    # Highest detail first (stable, like list.sort)
+    order = np.argsort(-vertex_counts, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+
+    lowered = np.array([name.lower() for name in names], dtype=str)
+    too_small = vertex_counts < MIN_VERTICES
+    by_name = _contains_any(lowered, DROP_NAME_KEYWORDS)
+    by_keyword = _contains_any(lowered, KEEP_NAME_KEYWORDS) | (
+        _contains_any(lowered, ("door",)) & ~_contains_any(lowered, ("proxy",)))
+
+    matches: Dict[int, List[int]] = {}
+    if n > 1:
+        a, b = _close_pairs(centers, sizes)
+        # Orient each pair larger mesh first: only a larger mesh can shadow a smaller one
+        swap = rank[a] > rank[b]
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+
+        # Exact test on the close pairs only
+        reference = np.maximum(np.maximum(sizes[a], sizes[b]), MIN_REFERENCE_SIZE)
+        dist = np.linalg.norm(centers[a] - centers[b], axis=1)
+        close = (dist / reference < CENTER_TOLERANCE) & (np.abs(sizes[a] - sizes[b]) / reference < SIZE_TOLERANCE)
+        a, b = a[close], b[close]
+        # Largest match first, so the first kept one is what the old pairwise loop reported
+        by_rank = np.argsort(rank[a], kind="stable")
+        for i, j in zip(a[by_rank].tolist(), b[by_rank].tolist()):
+            matches.setdefault(j, []).append(i)
+
+    too_small, by_name, by_keyword = too_small.tolist(), by_name.tolist(), by_keyword.tolist()
+    kept: List[int] = []
+    is_kept = [False] * n
+    overlaps = []
+    dropped = {"too_small": 0, "name": 0, "overlap": 0}
+    kept_by_keyword = 0
+    for j in order.tolist():
+        if too_small[j]:
+            dropped["too_small"] += 1
+            continue
+        if by_name[j]:
+            dropped["name"] += 1
+            continue
+        if by_keyword[j]:
+            kept_by_keyword += 1
+        else:
+            i = next((i for i in matches.get(j, ()) if is_kept[i]), None)
+            if i is not None:
+                dropped["overlap"] += 1
+                if len(overlaps) < MAX_REPORTED_OVERLAPS:
+                    overlaps.append({
+                        "dropped": names[j],
+                        "kept": names[i],
+                        "distance": float(np.linalg.norm(centers[j] - centers[i])),
+                        "size_difference": float(abs(sizes[j] - sizes[i])),
+                    })
+                continue
+        kept.append(j)
+        is_kept[j] = True
+
+    report = {
+        "candidates": n,
+        "kept": len(kept),
+        "kept_by_keyword": kept_by_keyword,
+        "dropped": dropped,
+        "overlaps": overlaps,
+    }
+    return kept, report
@@ -4,10 +4,15 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
+import sys
 import asyncio
-import subprocess
 import shutil
 import logging
+import threading
+import time
+import gc
+import functools
+from contextlib import contextmanager
 from pathlib import Path
 from collections import defaultdict
 import tempfile
@@ -36,6 +41,84 @@ except ImportError:
     blueprint_from_datacore_entity = None
     print("WARNING: scdatatools not installed.")
 
+# Catalog indexes (search, snapshot)
+try:
+    from .catalog import SearchIndex, PathTrie, CatalogEntry, RecordClass, snapshot_key, save_snapshot, load_snapshot
+except ImportError:
+    from catalog import SearchIndex, PathTrie, CatalogEntry, RecordClass, snapshot_key, save_snapshot, load_snapshot
+
+# P4K path index (replaces p4k.search globs in export/assembly)
+try:
+    from .p4k_index import P4KIndex
+except ImportError:
+    from p4k_index import P4KIndex
+
+# Memory-mapped zero-copy reads of Data.p4k entries
+try:
+    from .p4k_mmap import MappedP4K, BufferReader
+except ImportError:
+    from p4k_mmap import MappedP4K, BufferReader
+
+# Streaming parallel extraction from Data.p4k
+try:
+    from .extraction import extract_files
+except ImportError:
+    from extraction import extract_files
+
+# Content-addressed store of extracted entries, linked into export folders
+try:
+    from .object_store import ObjectStore
+except ImportError:
+    from object_store import ObjectStore
+
+# cgf-converter front end with the converted-part cache
+try:
+    from .converter import PartConverter, ConvertedPartCache, convert_parts, conversion_summary
+except ImportError:
+    from converter import PartConverter, ConvertedPartCache, convert_parts, conversion_summary
+
+# Geometry-only DAE reader (replaces trimesh/pycollada loading of converter output)
+try:
+    from .dae_reader import load_dae_scene, load_dae_part
+except ImportError:
+    from dae_reader import load_dae_scene, load_dae_part
+
+# Memory-mapped cache of parsed converter output (and of finished exports, for thumbnails)
+try:
+    from .mesh_cache import MeshCache, save_export_mesh
+except ImportError:
+    from mesh_cache import MeshCache, save_export_mesh
+
+# Dependency closure of a geometry file (what the converter actually reads)
+try:
+    from .dependencies import geometry_dependencies
+except ImportError:
+    from dependencies import geometry_dependencies
+
+# Import print-ready mesh writers
+try:
+    from .mesh_export import write_mesh, write_glb, EXPORT_FORMATS
+except ImportError:
+    from mesh_export import write_mesh, write_glb, EXPORT_FORMATS
+
+# Import out-of-core mesh merge
+try:
+    from .mesh_merge import MeshMerger, merge_duplicate_vertices
+except ImportError:
+    from mesh_merge import MeshMerger, merge_duplicate_vertices
+
+# Import LOD/duplicate filter
+try:
+    from .lod_filter import filter_lods
+except ImportError:
+    from lod_filter import filter_lods
+
+# Import in-process chunk geometry decoder
+try:
+    from .chunk_geometry import read_chunk_geometry
+except ImportError:
+    from chunk_geometry import read_chunk_geometry
+
 # Assembler import (separate try block to avoid breaking scdatatools import)
 try:
     from .assembler import BlueprintAssembler
@@ -52,9 +135,39 @@ CACHE_DIR = Path("cache")
 CACHE_DIR.mkdir(exist_ok=True)
 EXPORT_DIR = Path("exports")
 EXPORT_DIR.mkdir(exist_ok=True)
+CATALOG_DIR = CACHE_DIR / "catalog"  # Catalog snapshots, keyed by Data.p4k size/mtime + version
+OBJECT_DIR = CACHE_DIR / "objects"   # Extracted P4K entries, keyed by path + CRC + size
+CONVERTED_DIR = CACHE_DIR / "converted"  # Converter output, keyed by source entries + converter + flags
+CONVERTED_CACHE_MAX_BYTES = 5 * 1024 ** 3  # Least recently used parts are evicted past this
+MESH_DIR = CACHE_DIR / "meshes"  # Parsed DAE geometry (.npz), keyed by DAE content
+MESH_CACHE_MAX_BYTES = 5 * 1024 ** 3  # Least recently used parsed meshes are evicted past this
+MERGE_DIR = CACHE_DIR / "merge"  # Memory-mapped merge output for very large exports (removed afterwards)
+MERGE_MEMMAP_BYTES = 1024 ** 3  # Merged vertex+face arrays past this size live in MERGE_DIR, not RAM
+# Read P4K entries through a memory map (set False to go through p4k.read()/open() only)
+P4K_MMAP_READS = True
 
 # Path to cgf-converter (downloaded from https://github.com/Markemp/Cryengine-Converter)
 CGF_CONVERTER = Path(__file__).parent.parent / "tools" / "cgf-converter.exe"
+CONVERTER_WORKERS = os.cpu_count() or 4  # Parallel converter processes per blueprint export
+CONVERTER_TIMEOUT = 300  # Seconds per part before the converter process is killed
+CONVERTER_BATCH_SIZE = 32  # Max parts per converter process (1 = one process per part)
+# Decode CrCh geometry straight from P4K bytes; the converter only sees what this can't read.
+# Off until dev_scripts/test_chunk_geometry.py shows parity with converter output on real parts.
+DIRECT_GEOMETRY_DECODE = False
+# Drop the DataCore this long after the last export using it finishes (the next one reparses it)
+DATACORE_IDLE_SECONDS = 60
+
+# Game load phases, in order, with their rough share of a cold load (DataCore parse dominates)
+LOAD_PHASES = {
+    "p4k_open": 10,
+    "datacore_parse": 50,
+    "localization": 10,
+    "index_build": 30,
+}
+
+# Paging for /api/items and /api/search
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
 
 # Interesting paths to include in navigation
 INTERESTING_PATHS = {
@@ -137,6 +250,28 @@ BLACKLIST_SUFFIXES = {
     "_mal0", "_prop", "_iae",
 }
 
+# Suffixes that indicate a variant/skin (won't affect geometry)
+VARIANT_SUFFIXES = [
+    "_tint", "_red", "_blue", "_green", "_yellow", "_black", 
+    "_white", "_grey", "_gray", "_purple", "_orange", "_pink",
+    "_tan", "_gold", "_silver", "_chrome", "_copper",
+    "_wood", "_camo", "_polar", "_desert", "_forest",
+    "_executive", "_concierge", "_subscriber", "_dazzle",
+    "_digital", "_klibre"
+]
+
+# Compiled once: the record classifier runs these over every record at catalog build time
+# (longest alternatives first so overlapping suffixes resolve the same way every time)
+def _alternation(words) -> "re.Pattern":
+    return re.compile("|".join(re.escape(x) for x in sorted(words, key=len, reverse=True)))
+
+VARIANT_PATTERN = _alternation(VARIANT_SUFFIXES)
+BLACKLIST_SUFFIX_PATTERN = _alternation(BLACKLIST_SUFFIXES)
+BLACKLIST_TYPE_PATTERN = _alternation(BLACKLIST_TYPES)
+JUNK_NAME_PATTERN = re.compile(r"NPC_|Dialogue")
+# Base name for dedup: strip a trailing _01 (optionally preceded by _a/_b/_c), or a trailing _a/_b/_c
+BASE_NAME_PATTERN = re.compile(r"(?:_[a-c])?_\d{2}$|_[a-c]$", re.IGNORECASE)
+
 # --- 3D PRINT EXTRACTION CONFIG ---
 # Parts to KEEP even in personal item loadouts
 LOADOUT_WHITELIST = {
@@ -151,82 +286,469 @@ LOADOUT_BLACKLIST = {
 }
 # ----------------------------------
 
+# --- GEOMETRY SELECTION ---
+# Tags from geometry_for_record that generally contain the 'prop' version of an item
+GEOMETRY_PRIORITY_TAGS = ['inventoryStoredEntity', 'tableDisplay', 'heldEntity']
+
+def geometry_filename(geo) -> str:
+    """Path string of a geometry_for_record entry"""
+    return geo.filename if hasattr(geo, 'filename') else str(geo)
+
+def geometry_score(tag: str, path_str: str) -> int:
+    """Score a geometry candidate: static meshes of the item itself win, crates/displays lose"""
+    score = 0
+    path_lower = path_str.lower()
+
+    # Penalties
+    if '_display' in path_lower: score -= 500  # Display files are placeholders, not full models
+    if 'crate' in path_lower: score -= 100   # Crates are not the item
+    if 'mannequin' in path_lower: score -= 100
+
+    # Bonuses
+    if tag in GEOMETRY_PRIORITY_TAGS: score += 100
+    if '_prop' in path_lower: score += 50    # Explicit "prop" files are usually good
+    if '.skin' in path_lower: score += 30    # SKIN files have full animated mesh (cgf-converter v2.0 supports these)
+    if '.cga' in path_lower: score += 20     # CGA is usually high quality
+    if '.cgf' in path_lower: score += 10     # CGF is standard static mesh
+    if '.cdf' in path_lower: score += 5      # CDF is complex but often correct (we handle it now)
+
+    return score
+
+def select_geometry(geo_dict: Dict) -> Optional[tuple]:
+    """Best (score, tag, geo) from a geometry_for_record result (first one wins ties), or None"""
+    best = None
+    for tag, geo in geo_dict.items():
+        s = geometry_score(tag, geometry_filename(geo))
+        if best is None or s > best[0]:
+            best = (s, tag, geo)
+    return best
+# ----------------------------------
+
+def holds_datacore(method):
+    """
+    Mark an SCManager method (or a function taking the manager first) as a DataCore user
+    for its whole run, so the DataCore isn't dropped under it
+    """
+    @functools.wraps(method)
+    def wrapper(manager, *args, **kwargs):
+        with manager._using_datacore():
+            return method(manager, *args, **kwargs)
+    return wrapper
+
 # Global Manager
 class SCManager:
     def __init__(self):
         self.sc = None
         self.sc_path = None
         self.loading = False
+        self.load_status = self._new_load_status("idle")
+        self._catalog_ready = False
         self._category_cache = None
-        self._records_by_path = {}
-        self._records_by_manufacturer = defaultdict(lambda: defaultdict(list))
-        self._records_by_guid = {}
+        # Catalog (served from snapshot or built from DataCore): lightweight entries only
+        self._path_trie = PathTrie()
+        self._entries_by_manufacturer = {}
+        self._entries_by_guid = {}
+        self._record_classes = {}
+        self._labels = {}
+        self._search_index = None
+        # Geometry identity (filled by the background dedup pass): guid -> geometry path,
+        # geometry path -> guids sharing it, and manufacturer listings deduplicated by it
+        self._geometry_by_guid = {}
+        self._geometry_groups = {}
+        self._manufacturer_items = {}
+        self._catalog_key = None
+        self._generation = 0  # bumped on every load so a stale background pass can bail out
+        self.geometry_status = {"state": "idle", "done": 0, "total": 0}
+        # Case-folded record name -> guids (built from the catalog on first name lookup)
+        self._guids_by_name = None
+        # Guards the DataCore, which is only parsed while an export or the geometry pass needs it,
+        # and counts who is using it (it's released once nobody has for DATACORE_IDLE_SECONDS)
+        self._records_lock = threading.Lock()
+        self._datacore_users = 0
+        self._datacore_idle_timer = None
+        # Archive file list index, built on first export/assembly lookup
+        self._p4k_index = None
+        self._p4k_index_lock = threading.Lock()
+        self._p4k_mapped = None
+        # Every extraction goes through here; export folders only hold links to it
+        self.object_store = ObjectStore(OBJECT_DIR)
+        # Every conversion goes through here; each unique part is converted once
+        self.converted_cache = ConvertedPartCache(CONVERTED_DIR, CONVERTED_CACHE_MAX_BYTES)
+        # Converter output is parsed once, then memory-mapped on later exports
+        self.mesh_cache = MeshCache(MESH_DIR, MESH_CACHE_MAX_BYTES)
 
     def load_sc(self, path: str):
+        """Load game data and build the catalog, blocking until done (dev scripts)"""
+        self._claim_load(path)
+        self._run_load(path)
+
+    def start_load(self, path: str):
+        """Validate the path, then load game data on a background thread (progress in load_status)"""
+        self._claim_load(path)
+        threading.Thread(target=self._load_in_background, args=(path,), daemon=True).start()
+
+    def _claim_load(self, path: str):
         if self.loading:
             raise HTTPException(status_code=409, detail="Already loading")
         
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Path does not exist: {path}")
+        if not (Path(path) / "Data.p4k").exists():
+            raise FileNotFoundError("Data.p4k not found in path")
+        
         self.loading = True
-        try:
-            if not os.path.exists(path):
-                raise FileNotFoundError(f"Path does not exist: {path}")
-            
-            p4k_path = Path(path) / "Data.p4k"
-            if not p4k_path.exists():
-                raise FileNotFoundError("Data.p4k not found in path")
+        self.load_status = self._new_load_status("loading")
 
+    def _load_in_background(self, path: str):
+        try:
+            self._run_load(path)
+        except Exception:
+            pass  # Already printed and recorded in load_status
+
+    def _run_load(self, path: str):
+        p4k_path = Path(path) / "Data.p4k"
+        # Hide the previous game's catalog until the new one is built
+        self._catalog_ready = False
+        try:
             self.sc_path = path
             if StarCitizen:
-                self.sc = StarCitizen(path)
-                # Initialize Datacore and Localization
-                _ = self.sc.datacore
-                _ = self.sc.localization 
-                print(f"StarCitizen initialized: {self.sc.version_label}")
-                self._build_category_cache()
+                with self._load_phase("p4k_open"):
+                    self.sc = StarCitizen(path)
+                    self._guids_by_name = None
+                    self._p4k_index = None
+                    if self._p4k_mapped is not None:
+                        self._p4k_mapped.close()
+                        self._p4k_mapped = None
+                    self._geometry_by_guid = {}
+                    self._geometry_groups = {}
+                    self._generation += 1
+                    print(f"StarCitizen initialized: {self.sc.version_label}")
+                    
+                    # Serve browsing/search from the on-disk snapshot if this exact build was seen before
+                    self._catalog_key = snapshot_key(p4k_path, self.sc.version_label)
+                    snapshot_path = CATALOG_DIR / f"{self._catalog_key}.pickle"
+                    catalog = load_snapshot(snapshot_path)
+                    if not catalog:
+                        _ = self.sc.p4k  # DataCore and localization both live inside Data.p4k
+                
+                if catalog:
+                    self._skip_load_phase("datacore_parse")
+                    self._skip_load_phase("localization")
+                    with self._load_phase("index_build"):
+                        self._restore_catalog(catalog, snapshot_path)
+                else:
+                    # Initialize Datacore and Localization
+                    with self._load_phase("datacore_parse"):
+                        _ = self.sc.datacore
+                    with self._load_phase("localization"):
+                        _ = self.sc.localization
+                    with self._load_phase("index_build"):
+                        self._build_category_cache()
+                
+                # Browsing and search work from here on; the rest is bookkeeping
+                self._catalog_ready = True
+                self.load_status["state"] = "ready"
+                self.load_status["percent"] = 100
+                
+                if not catalog:
+                    self._save_catalog_snapshot(snapshot_path)
+                
+                # Group records sharing a geometry file (cached per build, otherwise resolved in the background)
+                dedup_running = self._start_geometry_dedup()
+                if not catalog and not dedup_running:
+                    # Labels pulled every record's property tree into memory; exports reparse on demand.
+                    # A running dedup pass still needs it, and releases it itself when it's done.
+                    self._release_datacore()
             else:
                 print("WARNING: scdatatools not installed, running in MOCK mode.")
+                self.load_status["state"] = "ready"
                 
         except Exception as e:
             print(f"Error loading SC: {e}")
             self.sc = None
             self.sc_path = None
+            self.load_status["state"] = "failed"
+            self.load_status["error"] = str(e)
             raise e
         finally:
             self.loading = False
 
+    @staticmethod
+    def _new_load_status(state: str) -> Dict[str, Any]:
+        """Fresh progress record for /api/status"""
+        return {
+            "state": state,             # idle | loading | ready | failed
+            "phase": None,              # phase currently running
+            "percent": 0,
+            "error": None,
+            "phases": [{"name": name, "state": "pending", "seconds": None} for name in LOAD_PHASES],
+        }
+
+    def _phase_entry(self, name: str) -> Dict[str, Any]:
+        return next(p for p in self.load_status["phases"] if p["name"] == name)
+
+    def _update_load_percent(self, fraction: float = 0.0):
+        """Percent complete from finished phases plus the running phase's own fraction"""
+        done = 0.0
+        for phase in self.load_status["phases"]:
+            if phase["state"] in ("done", "skipped"):
+                done += LOAD_PHASES[phase["name"]]
+            elif phase["state"] == "running":
+                done += LOAD_PHASES[phase["name"]] * min(max(fraction, 0.0), 1.0)
+        self.load_status["percent"] = int(done * 100 / sum(LOAD_PHASES.values()))
+
+    @contextmanager
+    def _load_phase(self, name: str):
+        """Mark a load phase as running for the duration of the block and record its timing"""
+        phase = self._phase_entry(name)
+        phase["state"] = "running"
+        self.load_status["phase"] = name
+        self._update_load_percent()
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            phase["state"] = "failed"
+            raise
+        finally:
+            phase["seconds"] = round(time.perf_counter() - start, 2)
+        phase["state"] = "done"
+        self.load_status["phase"] = None
+        self._update_load_percent()
+        print(f"Load phase {name}: {phase['seconds']}s")
+
+    def _skip_load_phase(self, name: str):
+        """Mark a phase the snapshot made unnecessary"""
+        self._phase_entry(name)["state"] = "skipped"
+        self._update_load_percent()
+
+    def _datacore(self):
+        """The parsed DataCore for exports, loaded on first use (the catalog never needs it)"""
+        if not self.sc:
+            return None
+        with self._records_lock:
+            if self._parsed_datacore is None:
+                print("Loading DataCore for export...")
+            datacore = self.sc.datacore
+            _ = self.sc.localization
+        return datacore
+
+    @contextmanager
+    def _using_datacore(self, load: bool = True):
+        """
+        Hold the DataCore for the duration of the block; yields it (loaded if needed), or None
+        with load=False (keeps whatever the block loads alive until it ends). When the last
+        user is done, the DataCore is released after DATACORE_IDLE_SECONDS unless it's used again.
+        """
+        with self._records_lock:
+            self._datacore_users += 1
+            if self._datacore_idle_timer is not None:
+                self._datacore_idle_timer.cancel()
+                self._datacore_idle_timer = None
+        try:
+            yield self._datacore() if load else None
+        finally:
+            with self._records_lock:
+                self._datacore_users -= 1
+                if not self._datacore_users and self._parsed_datacore is not None:
+                    timer = threading.Timer(DATACORE_IDLE_SECONDS, self._release_datacore)
+                    timer.daemon = True
+                    timer.start()
+                    self._datacore_idle_timer = timer
+
+    @property
+    def _parsed_datacore(self):
+        """
+        The DataCore the StarCitizen object has already parsed, or None. scdatatools has no
+        public way to ask or to drop it: its datacore property parses on access and caches
+        the result in the private _datacore attribute, reparsing whenever that is None. This
+        is the only place that touches the attribute; re-check it on scdatatools upgrades.
+        """
+        return getattr(self.sc, "_datacore", None) if self.sc is not None else None
+
+    @_parsed_datacore.setter
+    def _parsed_datacore(self, datacore):
+        self.sc._datacore = datacore
+
+    @property
+    def p4k_index(self) -> P4KIndex:
+        """Path index over Data.p4k, built once on first use"""
+        if self._p4k_index is None:
+            with self._p4k_index_lock:
+                if self._p4k_index is None:
+                    print("Indexing Data.p4k file list...")
+                    index = P4KIndex(self.sc.p4k)
+                    print(f"P4K index built: {len(index)} files")
+                    self._p4k_index = index
+        return self._p4k_index
+
+    @property
+    def p4k_reader(self):
+        """Entry reader for extraction and parsing: the memory-mapped P4K, or the P4KFile itself"""
+        if not P4K_MMAP_READS:
+            return self.sc.p4k
+        if self._p4k_mapped is None:
+            with self._p4k_index_lock:
+                if self._p4k_mapped is None:
+                    try:
+                        self._p4k_mapped = MappedP4K(self.sc.p4k)
+                    except (OSError, ValueError) as e:
+                        print(f"Warning: Could not memory-map Data.p4k, using regular reads: {e}")
+                        return self.sc.p4k
+        return self._p4k_mapped
+
+    @property
+    def part_converter(self) -> PartConverter:
+        """cgf-converter runner backed by the converted-part cache"""
+        return PartConverter(CGF_CONVERTER, self.converted_cache, self.p4k_index, timeout=CONVERTER_TIMEOUT)
+
+    def convert_parts(self, sources, objectdir: Path):
+        """Convert many extracted parts in batched converter runs on the worker pool"""
+        return convert_parts(self.part_converter, sources, objectdir,
+                             workers=CONVERTER_WORKERS, batch_size=CONVERTER_BATCH_SIZE)
+
+    def decode_geometry(self, geom_path: str):
+        """DaeScene of an archive geometry file decoded in-process, or None to use the converter"""
+        if not DIRECT_GEOMETRY_DECODE:
+            return None
+        try:
+            scene = read_chunk_geometry(self.p4k_reader, self.p4k_index, geom_path)
+        except Exception as e:
+            print(f"Warning: Could not decode {geom_path} in-process: {e}")
+            return None
+        if scene is None or not scene.placements():
+            return None
+        return scene
+
+    def _release_datacore(self) -> bool:
+        """
+        Drop the parsed DataCore and every record hanging off it; the next export reparses it.
+        Does nothing while an export or the geometry pass is using it. Returns whether it was dropped.
+        """
+        if not self.sc:
+            return False
+        with self._records_lock:
+            if self._datacore_users or self._parsed_datacore is None:
+                return False
+            self._parsed_datacore = None
+        # Records and the DataCore reference each other, so only the cycle collector frees them
+        gc.collect()
+        print("DataCore released")
+        return True
+
+    def _restore_catalog(self, catalog: Dict, snapshot_path: Path):
+        """Install a catalog read from an on-disk snapshot"""
+        self._path_trie = catalog["path_trie"]
+        self._entries_by_manufacturer = catalog["entries_by_manufacturer"]
+        self._entries_by_guid = catalog["entries_by_guid"]
+        self._record_classes = catalog["record_classes"]
+        self._labels = catalog["labels"]
+        self._search_index = catalog["search_index"]
+        self._category_cache = catalog["category_tree"]
+        # No geometry groups yet, so manufacturer listings are the raw groups
+        self._manufacturer_items = self._entries_by_manufacturer
+        print(f"Catalog loaded from snapshot: {len(self._entries_by_guid)} records ({snapshot_path.name})")
+
+    def _save_catalog_snapshot(self, snapshot_path: Path):
+        """Persist the built catalog so the next start can skip the DataCore load"""
+        try:
+            save_snapshot(snapshot_path, {
+                "path_trie": self._path_trie,
+                "entries_by_manufacturer": self._entries_by_manufacturer,
+                "entries_by_guid": self._entries_by_guid,
+                "record_classes": self._record_classes,
+                "labels": self._labels,
+                "search_index": self._search_index,
+                "category_tree": self._category_cache,
+            })
+            print(f"Catalog snapshot saved: {snapshot_path}")
+        except Exception as e:
+            print(f"Warning: Failed to save catalog snapshot: {e}")
+
     def _build_category_cache(self):
         """Build category tree from DataCore file paths"""
         print("Building category cache...")
-        self._records_by_path = defaultdict(list)
-        self._records_by_manufacturer = defaultdict(lambda: defaultdict(list))
-        self._records_by_guid = {}
+        path_trie = PathTrie()
+        entries_by_manufacturer = defaultdict(lambda: defaultdict(list))
+        entries_by_guid = {}
+        record_classes = {}
+        labels = {}
         
         base = "libs/foundry/records/"
         
-        for record in self.sc.datacore.records:
-            rel_path = record.filename.replace(base, "")
+        records = self.sc.datacore.records
+        total = len(records) or 1
+        for i, record in enumerate(records):
+            if i % 10000 == 0:
+                self._update_load_percent(i / total)
+            guid = str(record.id)
+            filename = record.filename
+            rel_path = filename.replace(base, "")
             dir_path = "/".join(rel_path.split("/")[:-1])
-            self._records_by_path[dir_path].append(record)
             
-            # Index by GUID for export lookup
-            self._records_by_guid[str(record.id)] = record
+            entry = CatalogEntry(guid, record.name, filename, str(record.type), dir_path)
+            entries_by_guid[guid] = entry
+            cls = self._classify_record(entry.name, entry.type)
+            record_classes[guid] = cls
+            
+            # Localize once here; search, listings and the snapshot all read this table
+            label = self._localized_label(record)
+            if label:
+                labels[guid] = label
+            
+            path_trie.insert(dir_path, entry)
             
             # Group by manufacturer for spaceships/vehicles
             for mfg_path in MANUFACTURER_GROUPED_PATHS:
                 if dir_path.startswith(mfg_path) or dir_path == mfg_path:
                     # Filter out AI variants, test units, etc.
-                    name_lower = record.name.lower()
-                    is_variant = any(suffix in name_lower for suffix in BLACKLIST_SUFFIXES)
-                    if is_variant:
+                    if cls.is_ai_variant:
                         continue
-                    
-                    # Extract manufacturer from item name (first part before _)
-                    name_parts = name_lower.split("_")
-                    if name_parts:
-                        mfg = name_parts[0]
-                        self._records_by_manufacturer[mfg_path][mfg].append(record)
+                    entries_by_manufacturer[mfg_path][cls.manufacturer].append(entry)
+        
+        self._record_classes = record_classes
+        self._labels = labels
+        self._path_trie = path_trie
+        # Plain dicts only: the catalog gets pickled into the snapshot
+        self._entries_by_manufacturer = {k: dict(v) for k, v in entries_by_manufacturer.items()}
+        self._entries_by_guid = entries_by_guid
         
-        # Build tree for interesting paths
+        # Pre-aggregate deduplicated item lists for every directory
+        self._aggregate_listings()
+        
+        self._build_search_index()
+        
+        tree = self._build_category_tree()
+        self._category_cache = tree
+        print(f"Category cache built: {len(tree)} top-level categories, {len(self._entries_by_guid)} records indexed")
+
+    def _aggregate_listings(self):
+        """Fill the per-directory and per-manufacturer item lists with the current dedup keys"""
+        self._path_trie.aggregate(self._listing_key)
+        
+        manufacturer_items = {}
+        for mfg_path, manufacturers in self._entries_by_manufacturer.items():
+            manufacturer_items[mfg_path] = {
+                mfg_code: self._dedup_by_geometry(entries)
+                for mfg_code, entries in manufacturers.items()
+            }
+        self._manufacturer_items = manufacturer_items
+
+    def _dedup_by_geometry(self, entries: List) -> List:
+        """Keep the first entry per geometry file (entries with unknown geometry are all kept)"""
+        seen = set()
+        unique = []
+        for entry in entries:
+            geo_path = self._geometry_by_guid.get(entry.guid)
+            if geo_path:
+                if geo_path in seen:
+                    continue
+                seen.add(geo_path)
+            unique.append(entry)
+        return unique
+
+    def _build_category_tree(self) -> List[Dict]:
+        """Build tree for interesting paths"""
         tree = []
         for path_prefix, display_name in INTERESTING_PATHS.items():
             if path_prefix in MANUFACTURER_GROUPED_PATHS:
@@ -235,13 +757,101 @@ class SCManager:
                 node = self._build_tree_node(path_prefix, display_name)
             if node:
                 tree.append(node)
+        return tree
+
+    def _start_geometry_dedup(self) -> bool:
+        """
+        Apply cached geometry groups for this build, or resolve them on a background thread.
+        Returns whether a background pass was started.
+        """
+        geometry_path = CATALOG_DIR / f"{self._catalog_key}.geometry.pickle"
+        geometry = load_snapshot(geometry_path)
+        if geometry is not None:
+            self._apply_geometry(geometry)
+            self.geometry_status = {"state": "done", "done": len(geometry), "total": len(geometry)}
+            print(f"Geometry groups loaded: {len(geometry)} records, {len(self._geometry_groups)} shared meshes")
+            return False
+        
+        if not geometry_for_record:
+            return False
+        threading.Thread(
+            target=self._geometry_dedup_pass,
+            args=(self._generation, geometry_path),
+            daemon=True,
+        ).start()
+        return True
+
+    def _geometry_dedup_pass(self, generation: int, geometry_path: Path):
+        """Resolve the export geometry of every browsable record and persist guid -> geometry path"""
+        sc = self.sc
+        entries = [e for path in INTERESTING_PATHS for e in self._path_trie.entries_under(path)]
+        self.geometry_status = {"state": "running", "done": 0, "total": len(entries)}
+        print(f"Geometry dedup: resolving {len(entries)} records in the background...")
         
-        self._category_cache = tree
-        print(f"Category cache built: {len(tree)} top-level categories, {len(self._records_by_guid)} records indexed")
+        try:
+            with self._using_datacore() as datacore:
+                records_by_guid = datacore.records_by_guid
+                geometry = {}
+                for i, entry in enumerate(entries):
+                    if generation != self._generation:
+                        print("Geometry dedup: aborted (game data reloaded)")
+                        return
+                    record = records_by_guid.get(entry.guid)
+                    if record is not None:
+                        try:
+                            best = select_geometry(geometry_for_record(record, data_root=sc.p4k) or {})
+                        except Exception:
+                            best = None
+                        if best:
+                            # Same selection export_item makes, so a group really exports to one mesh
+                            geometry[entry.guid] = geometry_filename(best[2]).replace("\\", "/").lower()
+                    self.geometry_status["done"] = i + 1
+            
+            if generation != self._generation:
+                return
+            save_snapshot(geometry_path, geometry)
+            self._apply_geometry(geometry)
+            self.geometry_status["state"] = "done"
+            print(f"Geometry dedup: {len(geometry)} records, {len(self._geometry_groups)} shared meshes")
+        except Exception as e:
+            print(f"Geometry dedup failed: {e}")
+            self.geometry_status["state"] = "failed"
+        finally:
+            datacore = records_by_guid = record = None
+            # Released here rather than after the cold load; an export still using it keeps it
+            if generation == self._generation:
+                self._release_datacore()
+
+    def _apply_geometry(self, geometry: Dict[str, str]):
+        """Install guid -> geometry path results, then re-aggregate listings and the tree"""
+        groups = defaultdict(list)
+        for guid, geo_path in geometry.items():
+            groups[geo_path].append(guid)
+        self._geometry_by_guid = geometry
+        # Only meshes shared by several records carry aliases
+        self._geometry_groups = {p: guids for p, guids in groups.items() if len(guids) > 1}
+        self._aggregate_listings()
+        self._category_cache = self._build_category_tree()
+
+    def _classify_record(self, name: str, rec_type: str) -> RecordClass:
+        """Run the compiled variant/junk/base-name patterns over one record"""
+        name_lower = name.lower()
+        # Variant suffixes present in the name (search still shows them if the query asks for one)
+        variants = tuple(dict.fromkeys(VARIANT_PATTERN.findall(name_lower)))
+        return RecordClass(
+            variants=variants,
+            is_variant=bool(variants),
+            is_ai_variant=BLACKLIST_SUFFIX_PATTERN.search(name_lower) is not None,
+            is_junk_type=BLACKLIST_TYPE_PATTERN.search(rec_type) is not None,
+            is_junk_name=JUNK_NAME_PATTERN.search(name) is not None,
+            base_name=BASE_NAME_PATTERN.sub("", name, count=1),
+            # Manufacturer code is the first part of the item name before _ (a few dozen distinct values)
+            manufacturer=sys.intern(name_lower.split("_")[0]),
+        )
 
     def _build_manufacturer_tree(self, path_prefix: str, display_name: str) -> Optional[Dict]:
         """Build tree grouped by manufacturer"""
-        manufacturers = self._records_by_manufacturer.get(path_prefix, {})
+        manufacturers = self._manufacturer_items.get(path_prefix, {})
         if not manufacturers:
             return None
         
@@ -262,27 +872,19 @@ class SCManager:
 
     def _build_tree_node(self, path_prefix: str, display_name: str, max_depth: int = 4) -> Optional[Dict]:
         """Recursively build a tree node from path prefix"""
+        node = self._path_trie.find(path_prefix)
+        if node is None:
+            return None
+        
         children_dirs = set()
-        has_direct_items = False
-        
-        for dir_path in self._records_by_path.keys():
-            if dir_path.startswith(path_prefix) and dir_path != path_prefix:
-                # Exclude unwanted flair subcategories
-                if "flair" in path_prefix and any(x in dir_path for x in ["/ship", "/origin", "/aegis", "/anvil"]):
-                     # Keep specific ones? User said "remove ship subcategory".
-                     # If dir_path contains "/ship", skip it, UNLESS it's "vehicle" (bobbleheads are in vehicle)
-                     # Wait, user said "vehicle subfolder in flair is fine".
-                     # So blacklist "ship" folder under flair.
-                     if "/ship" in dir_path and "flair" in dir_path:
-                         continue
-                
-                remainder = dir_path[len(path_prefix):].lstrip("/")
-                if remainder:
-                    next_level = remainder.split("/")[0]
-                    if not next_level.endswith(".xml") and next_level.lower() not in BLACKLIST_CATEGORIES:
-                        children_dirs.add(next_level)
-            elif dir_path == path_prefix:
-                has_direct_items = True
+        for child_dir in node.children:
+            # Exclude unwanted flair subcategories: "ship" folders go, "vehicle" (bobbleheads) stays
+            child_path = f"{path_prefix}/{child_dir}"
+            if "flair" in child_path and "/ship" in child_path:
+                continue
+            if not child_dir.endswith(".xml") and child_dir.lower() not in BLACKLIST_CATEGORIES:
+                children_dirs.add(child_dir)
+        has_direct_items = bool(node.entries)
         
         if not children_dirs and not has_direct_items:
             return None
@@ -306,174 +908,166 @@ class SCManager:
         return None
 
     def is_ready(self):
-        return self.sc is not None
+        return self.sc is not None and self._catalog_ready
 
     def get_categories(self):
         return self._category_cache or []
 
-    def search_items(self, query: str):
-        if not self.sc:
-            return []
+    def _localized_label(self, record) -> str:
+        """Resolve the localized display name of a record, or "" if it has none"""
+        if not hasattr(self.sc, 'localization') or not hasattr(record, 'properties'):
+            return ""
         
-        results = []
-        query = query.lower()
-        count = 0
+        # Try properties for localization key
+        # Common keys: Name, Display, Item Name
+        props = record.properties
+        loc_key = props.get('Name') or props.get('Display') or props.get('Item Name') or props.get('@Name')
         
-        
-        # Suffixes that indicate a variant
-        variant_suffixes = [
-            "_tint", "_red", "_blue", "_green", "_yellow", "_black", 
-            "_white", "_grey", "_gray", "_purple", "_orange", "_pink",
-            "_tan", "_gold", "_silver", "_chrome", "_copper",
-            "_wood", "_camo", "_polar", "_desert", "_forest",
-            "_executive", "_concierge", "_subscriber", "_dazzle",
-            "_digital", "_klibre"
-        ]
-        
-        limit = 200 # Increased limit
-        
-        
-        # Debug introspection counters
-        print(f"DEBUG: Searching for '{query}'")
-
-        for record in self.sc.datacore.records:
-            name_lower = record.name.lower()
-            
-            # 1. Filter by Name (Case-insensitive)
-            # Must match name OR filename
-            match = query in name_lower or query in record.filename.lower()
-            if not match:
-                continue
-                
-            # 2. Filter by Type (Junk Removal)
-            rec_type = str(record.type)
-            if any(junk in rec_type for junk in BLACKLIST_TYPES):
-                continue
-                
-            # 3. Filter by Name Patterns (Junk Removal)
-            if "NPC_" in record.name or "Dialogue" in record.name:
-                continue
+        # If key starts with @, localize it
+        if loc_key and isinstance(loc_key, str) and loc_key.startswith('@'):
+            label = self.sc.localization.gettext(loc_key)
+            if label and label != loc_key:
+                return label
+        return ""
 
-            # 4. Filter Variants (unless query explicitly requests them)
-            # If query matches the base name but not the variant suffix, hide it
-            is_variant = False
-            for suffix in variant_suffixes:
-                 if suffix in name_lower and suffix not in query:
-                     is_variant = True
-                     break
-            if is_variant:
+    def _build_search_index(self):
+        """Build the search index, applying junk filters once per record instead of per query"""
+        index = SearchIndex()
+        
+        for guid, entry in self._entries_by_guid.items():
+            # Junk Removal (by type or name pattern)
+            cls = self._record_classes[guid]
+            if cls.is_junk_type or cls.is_junk_name:
                 continue
-
-            # 5. Localization (Get Real Name)
-            display_name = record.name # Default to internal name
-            label = ""
-            
-            if hasattr(self.sc, 'localization'):
-                # Try properties for localization key
-                # Common keys: Name, Display, Item Name
-                loc_key = ""
-                if hasattr(record, 'properties'):
-                    props = record.properties
-                    loc_key = props.get('Name') or props.get('Display') or props.get('Item Name') or props.get('@Name')
-                
-                # If key starts with @, localize it
-                if loc_key and isinstance(loc_key, str) and loc_key.startswith('@'):
-                    label = self.sc.localization.gettext(loc_key)
             
             # If we found a localized label, use it as primary name
             # But keep internal name for reference
-            if label and label != loc_key:
-                final_name = label
-                subtitle = record.name
-            else:
-                final_name = record.name
-                subtitle = record.filename
-
-            results.append({
-                "id": str(record.id),
-                "name": final_name,           # Localized "Behring P4-AR"
-                "internal_name": record.name, # "behr_rifle_ballistic_01"
-                "type": rec_type,
-                "thumbnail": None
-            })
-            count += 1
-            if count >= limit:
-                break
+            label = self._labels.get(guid, "")
+            
+            # Variants are only hidden at query time (unless query explicitly requests them)
+            index.add(entry, (entry.name, entry.filename, label), cls.variants)
         
-        return results
+        self._search_index = index
+        print(f"Search index built: {len(index)} searchable records")
 
-    def get_items_by_path(self, category_path: str):
-        """Get items for a specific category path, deduplicated by base name"""
-        if not self.sc:
+    def search_items(self, query: str, offset: int = 0, limit: Optional[int] = 200):
+        if not self.sc or not self._search_index:
             return []
         
+        return [self._search_dict(e) for e in self._search_index.search(query, offset=offset, limit=limit)]
+
+    def _search_dict(self, entry) -> Dict[str, Any]:
+        """Search result payload: localized label as primary name, internal name for reference"""
+        return {
+            "id": entry.guid,
+            "name": self._labels.get(entry.guid) or entry.name,    # Localized "Behring P4-AR"
+            "internal_name": entry.name,                            # "behr_rifle_ballistic_01"
+            "type": entry.type,
+            "thumbnail": None
+        }
+
+    def count_search_results(self, query: str) -> int:
+        """Total number of search results (cached with the query's match list)"""
+        if not self.sc or not self._search_index:
+            return 0
+        return self._search_index.count(query)
+
+    def _category_entries(self, category_path: str) -> List:
+        """Precomputed, stably ordered item array for a category (or manufacturer) path"""
         # Check for manufacturer-grouped path
         if "::" in category_path:
             base_path, mfg_code = category_path.split("::", 1)
-            records = self._records_by_manufacturer.get(base_path, {}).get(mfg_code, [])
-            return [
-                {"id": str(r.id), "name": r.name, "thumbnail": None, "type": r.type, "filename": r.filename}
-                for r in records[:200]
-            ]
+            return self._manufacturer_items.get(base_path, {}).get(mfg_code, [])
         
-        results = []
-        count = 0
-        seen_base_names = set()  # Track unique base names for deduplication
-        
-        # Suffixes that indicate a variant/skin (won't affect geometry)
-        variant_suffixes = [
-            "_tint", "_red", "_blue", "_green", "_yellow", "_black", 
-            "_white", "_grey", "_gray", "_purple", "_orange", "_pink",
-            "_tan", "_gold", "_silver", "_chrome", "_copper",
-            "_wood", "_camo", "_polar", "_desert", "_forest",
-            "_executive", "_concierge", "_subscriber", "_dazzle",
-            "_digital", "_klibre"
-        ]
-        
-        import re
-
-        for dir_path, records in self._records_by_path.items():
-            if dir_path.startswith(category_path) or dir_path == category_path:
-                for record in records:
-                    # Variant Filter by color suffix
-                    name_lower = record.name.lower()
-                    is_variant = any(s in name_lower for s in variant_suffixes)
-                    if is_variant:
-                        continue
-                    
-                    # Name-based deduplication: strip trailing _01, _02, etc.
-                    # Pattern: NAME_XX where XX is 2 digits at end
-                    base_name = re.sub(r'_\d{2}$', '', record.name)
-                    
-                    # Also strip common texture variant suffixes like _a, _b, _c
-                    base_name = re.sub(r'_[a-c]$', '', base_name, flags=re.IGNORECASE)
-                    
-                    if base_name in seen_base_names:
-                        # Already have an item with this base name, skip
-                        continue
-                    seen_base_names.add(base_name)
-                        
-                    results.append({
-                        "id": str(record.id),
-                        "name": record.name,
-                        "thumbnail": None,
-                        "type": record.type,
-                        "filename": record.filename
-                    })
-                    count += 1
-                    if count >= 200:
-                        break
-            if count >= 200:
-                break
-        
-        return results
+        # Items are pre-aggregated and deduplicated per directory when the catalog is built
+        node = self._path_trie.find(category_path)
+        return node.items if node else []
+
+    def get_items_by_path(self, category_path: str, offset: int = 0, limit: Optional[int] = 200):
+        """Get one page of items for a category path, one per unique geometry (limit=None for all)"""
+        if not self.sc:
+            return []
+        
+        end = None if limit is None else offset + limit
+        return [self._item_dict(e) for e in self._category_entries(category_path)[offset:end]]
+
+    def _item_dict(self, entry) -> Dict[str, Any]:
+        """API payload for a catalog entry, named by its localized label when it has one"""
+        return {
+            "id": entry.guid,
+            "name": self._labels.get(entry.guid) or entry.name,
+            "internal_name": entry.name,
+            "thumbnail": None,
+            "type": entry.type,
+            "filename": entry.filename,
+            "aliases": self._aliases(entry.guid),
+        }
+
+    def _aliases(self, guid: str) -> List[Dict[str, str]]:
+        """Other records that export the same geometry file as this one"""
+        group = self._geometry_groups.get(self._geometry_by_guid.get(guid), ())
+        aliases = []
+        for alias_guid in group:
+            if alias_guid == guid:
+                continue
+            alias = self._entries_by_guid.get(alias_guid)
+            if alias:
+                aliases.append({"id": alias_guid, "name": self._labels.get(alias_guid) or alias.name})
+        return aliases
+
+    def count_items_by_path(self, category_path: str) -> int:
+        """Total number of items in a category path"""
+        if not self.sc:
+            return 0
+        return len(self._category_entries(category_path))
+
+    def _listing_key(self, entry) -> Optional[tuple]:
+        """Dedup key for category listings (geometry file, else base name), or None to hide a variant/skin"""
+        cls = self._record_classes[entry.guid]
+        if cls.is_variant:
+            return None
+        geo_path = self._geometry_by_guid.get(entry.guid)
+        return ("geometry", geo_path) if geo_path else ("name", cls.base_name)
 
     def get_record_by_guid(self, guid: str):
-        """Get a record by its GUID"""
-        return self._records_by_guid.get(guid)
+        """Get the full DataCore record for a GUID (parses the DataCore on first use)"""
+        if guid not in self._entries_by_guid:
+            return None
+        datacore = self._datacore()
+        return datacore.records_by_guid.get(guid) if datacore else None
 
-    def export_item(self, guid: str) -> Dict[str, Any]:
-        """Export an item to OBJ/DAE format"""
+    def get_records_by_name(self, name: str) -> List:
+        """Get all records with this name (case-insensitive)"""
+        if not name:
+            return []
+        guids = self._name_index().get(name.casefold(), ())
+        if not guids:
+            return []
+        datacore = self._datacore()
+        if not datacore:
+            return []
+        return [datacore.records_by_guid[g] for g in guids if g in datacore.records_by_guid]
+
+    def _name_index(self) -> Dict[str, List[str]]:
+        """Case-folded name -> guids, built from the catalog (names aren't unique)"""
+        if self._guids_by_name is None:
+            guids_by_name = defaultdict(list)
+            for guid, entry in self._entries_by_guid.items():
+                guids_by_name[entry.name.casefold()].append(guid)
+            self._guids_by_name = dict(guids_by_name)
+        return self._guids_by_name
+
+    def get_record_by_name(self, name: str):
+        """Get a record by name, preferring an exact-case match over a case-folded one"""
+        records = self.get_records_by_name(name)
+        for record in records:
+            if record.name == name:
+                return record
+        return records[0] if records else None
+
+    @holds_datacore
+    def export_item(self, guid: str, export_format: str = "obj") -> Dict[str, Any]:
+        """Export an item to OBJ/STL/3MF (see EXPORT_FORMATS), plus a GLB preview"""
         if not self.sc or not geometry_for_record:
             raise Exception("SC not loaded or scdatatools not available")
         
@@ -509,49 +1103,18 @@ class SCManager:
         # 2. Skinned meshes (.skin) which compile to empty OBJs without a skeleton
         # 3. Mannequins
         
-        # Priority tags generally containing the 'prop' version
-        PRIORITY_TAGS = ['inventoryStoredEntity', 'tableDisplay', 'heldEntity']
-        FALLBACK_TAGS = ['Male', 'Female', '']
-        all_tags = PRIORITY_TAGS + FALLBACK_TAGS
-        
-        def get_geo_score(tag, path_str):
-            score = 0
-            path_lower = path_str.lower()
-            
-            # Penalties
-            if '_display' in path_lower: score -= 500  # Display files are placeholders, not full models
-            if 'crate' in path_lower: score -= 100   # Crates are not the item
-            if 'mannequin' in path_lower: score -= 100
-            
-            # Bonuses
-            if tag in PRIORITY_TAGS: score += 100
-            if '_prop' in path_lower: score += 50    # Explicit "prop" files are usually good
-            if '.skin' in path_lower: score += 30    # SKIN files have full animated mesh (cgf-converter v2.0 supports these)
-            if '.cga' in path_lower: score += 20     # CGA is usually high quality
-            if '.cgf' in path_lower: score += 10     # CGF is standard static mesh
-            if '.cdf' in path_lower: score += 5      # CDF is complex but often correct (we handle it now)
-            
-            return score
-
         # Score all options
-        scored_geos = []
         print(f"Geometry candidates:")
         for tag, geo in geo_dict.items():
-            if hasattr(geo, 'filename'):
-                path_str = geo.filename
-            else:
-                path_str = str(geo)
-            
-            s = get_geo_score(tag, path_str)
-            scored_geos.append((s, tag, geo))
-            print(f"  [{s:>4}] {tag}: {path_str}")
+            path_str = geometry_filename(geo)
+            print(f"  [{geometry_score(tag, path_str):>4}] {tag}: {path_str}")
             
         # Select best
-        scored_geos.sort(key=lambda x: x[0], reverse=True)
-        
-        if scored_geos:
-            selected_geo = scored_geos[0][2]
-            print(f"Selected geometry: {selected_geo.filename if hasattr(selected_geo, 'filename') else selected_geo} (Score: {scored_geos[0][0]})")
+        best = select_geometry(geo_dict)
+        selected_geo = None
+        if best:
+            selected_geo = best[2]
+            print(f"Selected geometry: {geometry_filename(selected_geo)} (Score: {best[0]})")
         
         geo_info = selected_geo
         if not geo_info:
@@ -579,7 +1142,7 @@ class SCManager:
                 print(f"Detected CDF file, parsing to find actual geometry...")
                 try:
                     # Read the CDF from P4K and parse as XML
-                    cdf_content = self.sc.p4k.read(geo_info.filename)
+                    cdf_content = self.p4k_reader.read(self.p4k_index.get(geo_info.filename) or geo_info.filename)
                     
                     # Parse XML - CDF files are CryXML (binary) or plain XML
                     import xml.etree.ElementTree as ET
@@ -588,8 +1151,7 @@ class SCManager:
                     except ET.ParseError:
                         # CryXML binary format - use scdatatools to parse
                         from scdatatools.engine.cryxml import etree_from_cryxml_file
-                        from io import BytesIO
-                        root = etree_from_cryxml_file(BytesIO(cdf_content))
+                        root = etree_from_cryxml_file(BufferReader(cdf_content))
                         model_elem = root.find(".//Model")
                         if model_elem is not None:
                             model_file = model_elem.get("File", "")
@@ -618,7 +1180,7 @@ class SCManager:
                  print(f"CDF pointed to skeleton (.chr), searching for geometry in {actual_geom_path.parent}...")
                  # Ensure we search in the right P4K path
                  parent_search = actual_geom_path.parent.as_posix()
-                 candidates = self.sc.p4k.search(f"{parent_search}/*")
+                 candidates = self.p4k_index.walk(parent_search)
                  
                  # Look for geometry files: .skin (animated mesh), .cga, .cgf
                  # IMPORTANT: Exclude _display files (placeholders) and _lod files
@@ -652,85 +1214,98 @@ class SCManager:
             # 3. If it's a .cgf, check if there's a higher quality .cga version
             if actual_geom_path.suffix.lower() == ".cgf":
                 cga_path = actual_geom_path.with_suffix(".cga")
-                if f"Data/{cga_path.as_posix()}".lower() in [f.filename.lower() for f in self.sc.p4k.search(f"{cga_path.parent.as_posix()}/*")]:
+                if self.p4k_index.exists(cga_path.as_posix()):
                     print(f"Found CGA version, using: {cga_path}")
                     actual_geom_path = cga_path
             
-            parent_dir = actual_geom_path.parent.as_posix()
+            # 4. Decode the chunk file in-process when we can: no extraction, no converter run
+            decoded = self.decode_geometry(actual_geom_path.as_posix())
+            if decoded is not None:
+                print(f"Decoded {actual_geom_path.name} in-process, skipping extraction and conversion")
+                extraction_report = {"decoded": True, "missing": []}
+            else:
+                parent_dir = actual_geom_path.parent.as_posix()
             
-            # 4. Extract ALL relevant files in that directory (textures, materials, CGFs)
-            print(f"Extracting all files from: {parent_dir}")
-            files_to_extract = self.sc.p4k.search(f"{parent_dir}/*")
-            print(f"Found {len(files_to_extract)} dependent files")
+                # 5. Extract only what the converter reads: geometry, companion mesh stream, materials
+                #    (the converter runs with -notex, so the directory's textures are never touched)
+                files_to_extract, missing = geometry_dependencies(self.p4k_reader, self.p4k_index, actual_geom_path.as_posix())
+                for path in missing:
+                    print(f"Warning: Dependency not found in P4K: {path}")
+                directory_files = self.p4k_index.walk(parent_dir)
+                if not files_to_extract:
+                    print(f"Could not resolve dependencies, extracting all files from: {parent_dir}")
+                    files_to_extract = directory_files
+                print(f"Found {len(files_to_extract)} dependent files")
             
-            for f in files_to_extract:
-                # Extract maintaining relative structure inside export_path
-                dest = export_path / f.filename
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                try:
-                    dest.write_bytes(self.sc.p4k.read(f.filename))
-                except Exception as e:
-                    print(f"Warning: Failed to extract {f.filename}: {e}")
-
-            # 5. Path to the extracted CGF (use actual_geom_path, not original)
-            cgf_local_path = export_path / f"Data/{actual_geom_path.as_posix()}"
+                # Extract maintaining relative structure inside export_path (streamed, in parallel)
+                stats = extract_files(self.p4k_reader, files_to_extract, export_path, store=self.object_store)
+                print(f"Extracted {stats}")
+            
+                wanted = {f.filename.lower() for f in files_to_extract}
+                skipped = [f for f in directory_files if f.filename.lower() not in wanted]
+                extraction_report = {
+                    **stats.as_dict(),
+                    "decoded": False,
+                    "skipped_files": len(skipped),
+                    "skipped_bytes": sum(f.file_size for f in skipped),
+                    "missing": missing,
+                }
+                print(f"Skipped {len(skipped)} unneeded files in {parent_dir} "
+                      f"({extraction_report['skipped_bytes'] / (1024 * 1024):.1f} MB)")
+
+                # 6. Path to the extracted CGF (use actual_geom_path, not original)
+                cgf_local_path = export_path / f"Data/{actual_geom_path.as_posix()}"
             
-            # If the actual geom path doesn't include 'Data/', adjust
-            if not cgf_local_path.exists():
-                cgf_local_path = export_path / actual_geom_path
+                # If the actual geom path doesn't include 'Data/', adjust
+                if not cgf_local_path.exists():
+                    cgf_local_path = export_path / actual_geom_path
             
         except Exception as e:
              raise Exception(f"Failed to extract item files: {e}")
 
-        # Convert using cgf-converter (DAE mode for reliable geometry)
-        if not CGF_CONVERTER.exists():
-            raise Exception(f"cgf-converter not found at {CGF_CONVERTER}")
+        if decoded is None:
+            # Convert using cgf-converter (DAE mode for reliable geometry)
+            if not CGF_CONVERTER.exists():
+                raise Exception(f"cgf-converter not found at {CGF_CONVERTER}")
         
-        print(f"Running cgf-converter (DAE mode) on {cgf_local_path}")
+            print(f"Running cgf-converter (DAE mode) on {cgf_local_path}")
         
-        try:
             # Use -dae flag for Collada output (more reliable than direct -obj)
             # Use the export path as objectdir to resolve materials correctly
-            obj_dir = export_path
-            
-            result = subprocess.run(
-                [str(CGF_CONVERTER), str(cgf_local_path), "-dae", "-objectdir", str(obj_dir), "-notex"],
-                capture_output=True,
-                text=True,
-                timeout=300, # Give it time
-                check=False
-            )
-            print(f"cgf-converter output: {result.stdout}")
-            if result.returncode != 0:
-                print(f"cgf-converter error output: {result.stderr}")
-                raise Exception(f"Converter failed with code {result.returncode}")
-
-        except subprocess.TimeoutExpired:
-            raise Exception("Conversion timed out")
-        except Exception as e:
-            raise Exception(f"Conversion failed: {e}")
-        
-        # Locate the generated DAE file (using DAE format for SC 4.5 compatibility)
-        dae_file = cgf_local_path.with_suffix('.dae')
-        
-        # If not found, search recursively in export path
-        if not dae_file.exists():
-            print(f"DAE not found at expected path {dae_file}, scanning...")
-            daes = list(export_path.rglob("*.dae"))
-            if daes:
-                dae_file = daes[0]
-                print(f"Found DAE: {dae_file}")
+            result = self.part_converter.convert(cgf_local_path, export_path)
+            if result.cached:
+                print(f"Converted part served from cache ({result.seconds:.2f}s)")
             else:
-                raise Exception("No DAE file generated by converter")
+                print(f"cgf-converter output: {result.stdout}")
+            if result.error:
+                if result.stderr:
+                    print(f"cgf-converter error output: {result.stderr}")
+                raise Exception(f"Conversion failed: {result.error}")
+        
+            # Locate the generated DAE file (using DAE format for SC 4.5 compatibility)
+            dae_file = cgf_local_path.with_suffix('.dae')
+        
+            # If not found, search recursively in export path
+            if not dae_file.exists():
+                print(f"DAE not found at expected path {dae_file}, scanning...")
+                daes = list(export_path.rglob("*.dae"))
+                if daes:
+                    dae_file = daes[0]
+                    print(f"Found DAE: {dae_file}")
+                else:
+                    raise Exception("No DAE file generated by converter")
         
-        print(f"DAE generated at: {dae_file} (Size: {dae_file.stat().st_size} bytes)")
+            print(f"DAE generated at: {dae_file} (Size: {dae_file.stat().st_size} bytes)")
         
         # Post-Processing: Load DAE (Collada) file
         try:
             print("Loading DAE mesh...")
             
-            # Load DAE with Trimesh
-            mesh = trimesh.load(dae_file, force='scene')
+            # Load DAE geometry and node tree (materials are never parsed)
+            if decoded is not None:
+                mesh = decoded.to_trimesh_scene()
+            else:
+                mesh = load_dae_scene(dae_file, self.mesh_cache)
             
             # --- ASSEMBLY SYSTEM ---
             try:
@@ -748,6 +1323,7 @@ class SCManager:
             # Previously we just grabbed geometries, which collapsed everything to (0,0,0).
             # This caused "jumbled" ships and false-positive LOD filtering (because everything overlapped).
             
+            lod_report = None
             if isinstance(mesh, trimesh.Scene):
                 # Apply transforms and flatten the scene, but keep individual geometries for analysis if possible?
                 # trimesh.scenes.scene.Scene.dump(concatenate=False) returns a list of meshes with transforms applied!
@@ -756,98 +1332,31 @@ class SCManager:
                 # Use dump to get consistent meshes with transforms applied
                 meshes_with_transforms = mesh.dump(concatenate=False)
                 
-                candidates = []
+                candidates, names = [], []
                 for idx, m in enumerate(meshes_with_transforms):
-                    if isinstance(m, trimesh.Trimesh):
-                        # Skip empty meshes
-                        if len(m.vertices) == 0:
-                            continue
-                        
+                    # Skip empty meshes
+                    if isinstance(m, trimesh.Trimesh) and len(m.vertices):
+                        candidates.append(m)
                         # Try to get name from metadata
-                        name = m.metadata.get('name', f'Mesh_{idx}') if m.metadata else f'Mesh_{idx}'
-                            
-                        candidates.append({
-                            'name': name,
-                            'geom': m,
-                            'vertices': len(m.vertices),
-                            # Use bounding box center of the TRANSFORMED mesh
-                            'center': m.bounds.mean(axis=0), 
-                            'extents': m.extents
-                        })
-                
-                # Sort by vertex count descending (High detail first)
-                candidates.sort(key=lambda x: x['vertices'], reverse=True)
-                
-                print(f"LOD Processing: {len(candidates)} candidate meshes")
-                
-                final_meshes = []
-                for i, c1 in enumerate(candidates):
-                    # Filter tiny junk (physics proxies, locators)
-                    # Lowered threshold to 10 to clear buttons/switches but keep small detail
-                    if c1['vertices'] < 10:
-                        print(f"  [Drop] Mesh {i} ({c1['vertices']} verts): Too small (<10)")
-                        continue
-                        
-                    is_lod = False
-                    reason = ""
-                    
-                    # Calculate characteristic size (diagonal of bounding box)
-                    size_c1 = np.linalg.norm(c1['extents'])
-                    
-                    name_lower = c1['name'].lower()
-                    
-                    # 1. Negative Filter: Explicit Logic/Physics/Proxy meshes
-                    if "proxy" in name_lower or "$physics" in name_lower or "_lod" in name_lower:
-                        print(f"  [Drop] Mesh {i} '{c1['name']}': Name indicates Proxy/LOD")
-                        continue
-                        
-                    # 2. Positive Filter: Always keep Glass, Guts (Interiors), Details, Doors
-                    if "glass" in name_lower or "guts" in name_lower or "interior" in name_lower or "door" in name_lower and "proxy" not in name_lower:
-                         final_meshes.append(c1)
-                         print(f"  [Keep] Mesh {i} '{c1['name']}' ({c1['vertices']} verts, Size: {size_c1:.2f}) [Keyword Kept]")
-                         continue
-
-                    # Check against already kept meshes for overlapping LODs
-                    for c2 in final_meshes:
-                        size_c2 = np.linalg.norm(c2['extents'])
-                        
-                        # Distance between centers
-                        dist = np.linalg.norm(c1['center'] - c2['center'])
-                        
-                        # Relative Tolerance: 1% of the LARGER object's size
-                        # If centers are this close, they share origin/position.
-                        max_size = max(size_c1, size_c2, 0.1) # Avoid div/0
-                        rel_dist = dist / max_size
-                        
-                        # Size Similarity: Are they roughly the same scale? (within 2%)
-                        # LODs are usually almost identical in box size (<1.5% diff).
-                        # Distinct parts (like Canopy Glass vs Frame) are often >3% different.
-                        size_diff = abs(size_c1 - size_c2)
-                        rel_size_diff = size_diff / max_size
-                        
-                        if rel_dist < 0.01: # Centers are very close (relative to size)
-                             if rel_size_diff < 0.02: # Sizes are within 2% (Very strict)
-                                 is_lod = True
-                                 reason = f"Overlaps with Mesh {final_meshes.index(c2)} '{c2['name']}' (Dist: {dist:.3f}, SizeDiff: {size_diff:.3f})"
-                                 break
-                    
-                    if not is_lod:
-                        final_meshes.append(c1)
-                        print(f"  [Keep] Mesh {i} '{c1['name']}' ({c1['vertices']} verts, Size: {size_c1:.2f})")
-                    else:
-                        print(f"  [Drop] Mesh {i} '{c1['name']}' ({c1['vertices']} verts): {reason}")
-                
-                if final_meshes:
-                    print(f"LOD Filter: Kept {len(final_meshes)}/{len(candidates)} meshes")
+                        names.append((m.metadata or {}).get('name', f'Mesh_{idx}'))
+                if not candidates:
+                    raise Exception("LOD Filter: Input DAE contained no valid meshes.")
+
+                # Largest-first duplicate check on the bounding boxes of the TRANSFORMED meshes
+                keep, lod_report = filter_lods(names, [len(m.vertices) for m in candidates],
+                                               np.array([m.bounds for m in candidates]))
+                dropped = lod_report['dropped']
+                print(f"LOD Filter: Kept {len(keep)}/{len(candidates)} meshes "
+                      f"(dropped {dropped['overlap']} overlapping LODs, {dropped['name']} proxies/LODs by name, "
+                      f"{dropped['too_small']} under 10 verts)")
+
+                if keep:
                     # Concatenate the kept meshes (they already have transforms applied from dump())
-                    mesh = trimesh.util.concatenate([c['geom'] for c in final_meshes])
+                    mesh = trimesh.util.concatenate([candidates[i] for i in keep])
                 else:
                     # Fallback: If we filtered everything (e.g. everything was < 10 verts?), keep the largest one at least
-                    if candidates:
-                        print("Warning: LOD Filter removed all geometry. Forcing keep of largest mesh.")
-                        mesh = candidates[0]['geom']
-                    else:
-                         raise Exception("LOD Filter: Input DAE contained no valid meshes.")
+                    print("Warning: LOD Filter removed all geometry. Forcing keep of largest mesh.")
+                    mesh = max(candidates, key=lambda m: len(m.vertices))
             
             # Align: User asked for centered axis (Center the final result)
             mesh.apply_translation(-mesh.centroid)
@@ -861,9 +1370,8 @@ class SCManager:
             # Force matte white material for clean 3D print preview
             mesh.visual = trimesh.visual.ColorVisuals(mesh, face_colors=[200, 200, 200, 255])
             
-            # Export clean OBJ
-            final_obj_path = export_path / f"{safe_name_clean}.obj"
-            mesh.export(str(final_obj_path))
+            # Export clean OBJ/STL/3MF (geometry only, no material references)
+            final_model_path = write_mesh(export_path / safe_name_clean, mesh.vertices, mesh.faces, export_format)
             
             # Export GLB for Web Preview
             final_glb_path = export_path / f"{safe_name_clean}.glb"
@@ -872,14 +1380,19 @@ class SCManager:
                 mesh.export(str(final_glb_path))
             except Exception as e:
                 print(f"GLB Export failed (Preview will be unavailable): {e}")
+            try:
+                # Raw arrays for thumbnail rendering (memory-mapped instead of parsing the GLB)
+                save_export_mesh(final_glb_path, mesh.vertices, mesh.faces)
+            except Exception as e:
+                print(f"Mesh array export failed: {e}")
             
-            print(f"OBJ export complete: {final_obj_path} (Size: {final_obj_path.stat().st_size} bytes)")
+            print(f"{export_format.upper()} export complete: {final_model_path} (Size: {final_model_path.stat().st_size} bytes)")
             
 
             # Optional: delete original DAE? User might want it, but we promised OBJ
             # dae_file.unlink(missing_ok=True) 
             
-            final_output = final_obj_path
+            final_output = final_model_path
             
         except Exception as e:
             print(f"Conversion to OBJ failed: {e}")
@@ -892,10 +1405,13 @@ class SCManager:
             "name": record.name,
             "output_file": str(final_output),
             "preview_url": f"/api/download/{safe_name_clean}/{final_glb_path.name}" if final_glb_path.exists() else None,
-            "download_url": f"/api/download/{safe_name_clean}/{final_output.name}"
+            "download_url": f"/api/download/{safe_name_clean}/{final_output.name}",
+            "extraction": extraction_report,
+            "lod_filter": lod_report,
         }
 
-    def export_item_blueprint(self, guid: str) -> Dict[str, Any]:
+    @holds_datacore
+    def export_item_blueprint(self, guid: str, export_format: str = "obj") -> Dict[str, Any]:
         """
         Export an item using the scdatatools Blueprint API.
         This properly handles complex assets like ships with landing gear.
@@ -985,35 +1501,39 @@ class SCManager:
         except Exception as e:
             print(f"[Blueprint Export] Blueprint generation failed: {e}")
             # Fall back to legacy method
-            return self.export_item(guid)
+            return self.export_item(guid, export_format)
         
-        # 2. Extract assets WITH auto-conversion (like StarFab does)
-        # scdatatools' built-in conversion works with SC 4.5
-        log_progress(2, 5, "Extraction & Conversion (scdatatools)...")
+        # 2. Extract assets (like StarFab does)
+        # Conversion happens below through the converted-part cache instead of scdatatools'
+        # auto-conversion, which would re-run the converter on every part of every export
+        log_progress(2, 5, "Extraction (scdatatools)...")
         try:
-            # Let scdatatools handle the conversion - it works with SC 4.5
             bp.extract(
                 outdir=export_path,
                 monitor=monitor,
-                auto_convert_models=True,  # Enable scdatatools' internal conversion
-                cgf_converter_bin=str(CGF_CONVERTER),  # Provide path to converter
+                auto_convert_models=False,
+                cgf_converter_bin=str(CGF_CONVERTER),
                 skip_lods=True,
             )
+            # scdatatools extracted on its own: swap its raw files for links into the shared store
+            try:
+                adopted = self.object_store.adopt_tree(self.p4k_index, export_path)
+                print(f"[Blueprint Export] Deduplicated {adopted} extracted files into the object store")
+            except Exception as e:
+                print(f"[Blueprint Export] Object store dedup skipped: {e}")
             
         except Exception as e:
             print(f"[Blueprint Export] Extraction failed: {e}")
-            return self.export_item(guid)
+            return self.export_item(guid, export_format)
         
         # 3. Manual Batch Conversion & Assembly
-        merged_meshes = []
-        
         # Check if blueprint has geometry
         if not bp.geometry:
             print("[Blueprint Export] No geometry in blueprint. Falling back to legacy.")
-            return self.export_item(guid)
+            return self.export_item(guid, export_format)
 
-        # Helper to convert single file (using DAE for SC 4.5 compatibility)
-        def convert_to_dae(rel_path):
+        # Helper to locate a part's extracted source file
+        def find_source(rel_path):
             # Try multiple path variations
             # bp.geometry keys are like "objects/..." but extraction puts files in "Data/Objects/..."
             candidates = [
@@ -1023,148 +1543,171 @@ class SCManager:
                 export_path / "Data" / rel_path.replace("objects/", "Objects/"),
             ]
             
-            src_file = None
             for c in candidates:
                 if c.exists():
-                    src_file = c
-                    break
-            
-            if not src_file:
-                return None
-                
-            dae_file = src_file.with_suffix(".dae")
-            if dae_file.exists() and dae_file.stat().st_size > 100:
-                return dae_file
-            
-            # Convert using DAE format (works with SC 4.5)
-            cmd = [str(CGF_CONVERTER), str(src_file), "-dae", "-objectdir", str(export_path), "-notex"]
-            try:
-                subprocess.run(cmd, check=True, capture_output=True)
-                if dae_file.exists():
-                    return dae_file
-            except:
-                pass
+                    return c
             return None
 
         print(f"[Blueprint Export] Processing {len(bp.geometry)} geometry entries...")
         
+        parts = []
         for geom_key, geom_data in bp.geometry.items():
             # Filter unwanted types
             key_lower = geom_key.lower()
             if any(x in key_lower for x in ["proxy", "physics", "$helper", "_lod"]):
                 continue
-                
-            # Convert to DAE (using Collada format for SC 4.5 compatibility)
-            dae_path = convert_to_dae(geom_key)
-            if not dae_path:
-                print(f"  [Warning] Missing or failed conversion: {geom_key}")
+            parts.append((geom_key, geom_data, find_source(geom_key)))
+
+        # Decode what we can in-process; only the rest goes through the converter.
+        # Only sizes are kept here: decoded parts are decoded again, one at a time, while merging
+        decoded = {}
+        for geom_key, _, _ in parts:
+            scene = self.decode_geometry(geom_key)
+            if scene is not None:
+                decoded[geom_key] = scene.counts()
+        scene = None
+        print(f"[Blueprint Export] Decoded {len(decoded)}/{len(parts)} parts in-process")
+
+        # Convert every other part to DAE at once (using Collada format for SC 4.5 compatibility)
+        to_convert = []
+        for geom_key, _, src_file in parts:
+            if src_file is None or geom_key in decoded:
                 continue
-                
-            try:
-                # Validate DAE file is not empty/corrupt before loading
-                dae_size = dae_path.stat().st_size
-                if dae_size < 100:  # Minimal valid DAE is larger than 100 bytes
-                    print(f"  [Warning] Empty/corrupt DAE file ({dae_size} bytes): {geom_key}")
+            dae_file = src_file.with_suffix(".dae")
+            if not (dae_file.exists() and dae_file.stat().st_size > 100):
+                to_convert.append(src_file)
+
+        log_progress(3, 5, f"Converting {len(to_convert)} parts ({CONVERTER_WORKERS} workers)...")
+        convert_start = time.perf_counter()
+        conversions = self.convert_parts(to_convert, export_path)
+        conversion_report = conversion_summary(conversions, time.perf_counter() - convert_start)
+        for src_file, result in conversions.items():
+            if result.error:
+                print(f"  [Warning] Conversion failed ({result.seconds:.1f}s): {src_file.name}: {result.error}")
+        print(f"[Blueprint Export] Converted {conversion_report['converted']}, cached {conversion_report['cached']}, "
+              f"failed {conversion_report['failed']} in {conversion_report['seconds']:.1f}s "
+              f"({conversion_report['cpu_seconds']:.1f}s converter time)")
+
+        def load_part(geom_key, dae_path):
+            """DaeScene of a part: decoded from the P4K, or its converted DAE (memory-mapped from the mesh cache)"""
+            if dae_path is None:
+                return self.decode_geometry(geom_key)
+            return load_dae_part(dae_path, self.mesh_cache)
+
+        # 4. Sizing pass: vertex/face counts of every loadable part (nothing is kept loaded)
+        sources = []
+        for geom_key, geom_data, src_file in parts:
+            dae_path = None
+            if geom_key in decoded:
+                counts = decoded[geom_key]
+            else:
+                if src_file is not None:
+                    result = conversions.get(src_file)
+                    dae_path = result.dae if result else src_file.with_suffix(".dae")
+                if not dae_path:
+                    print(f"  [Warning] Missing or failed conversion: {geom_key}")
                     continue
-                    
-                # Load DAE
-                mesh = trimesh.load(dae_path, force='scene')
-                
-                # Apply Transform
-                # Use world_transform if available, else local? map to identity?
-                # Usually we want the relative transform to the root
-                # geom_data in scdatatools usually has 'transform' matrix
-                transform = np.eye(4)
-                if hasattr(geom_data, 'transform'):
-                    transform = np.array(geom_data.transform).reshape(4,4)
-                
-                # Convert Scene to single Trimesh if needed
-                if isinstance(mesh, trimesh.Scene):
-                    # Apply transform to scene, then convert to single mesh
-                    mesh.apply_transform(transform)
-                    # Dump all geometry and concatenate into single mesh
-                    geometries = list(mesh.geometry.values())
-                    if geometries:
-                        mesh = trimesh.util.concatenate(geometries)
-                    else:
-                        print(f"  [Warning] Scene has no geometry: {geom_key}")
+                try:
+                    # Validate DAE file is not empty/corrupt before loading
+                    dae_size = dae_path.stat().st_size
+                    if dae_size < 100:  # Minimal valid DAE is larger than 100 bytes
+                        print(f"  [Warning] Empty/corrupt DAE file ({dae_size} bytes): {geom_key}")
                         continue
-                elif isinstance(mesh, trimesh.Trimesh):
-                    mesh.apply_transform(transform)
-                else:
-                    print(f"  [Warning] Unknown mesh type: {type(mesh)}")
+                    counts = load_part(geom_key, dae_path).counts()
+                except Exception as e:
+                    print(f"  [Error] Failed to load {geom_key}: {e}")
                     continue
-                    
-                merged_meshes.append(mesh)
-            except Exception as e:
-                print(f"  [Error] Failed to load/transform {geom_key}: {e}")
+            if not counts[1]:
+                print(f"  [Warning] Scene has no geometry: {geom_key}")
+                continue
 
-        log_progress(4, 5, f"Assembled {len(merged_meshes)} meshes. Merging...")
+            # Apply Transform
+            # Use world_transform if available, else local? map to identity?
+            # Usually we want the relative transform to the root
+            # geom_data in scdatatools usually has 'transform' matrix
+            transform = np.eye(4)
+            if hasattr(geom_data, 'transform'):
+                transform = np.array(geom_data.transform).reshape(4,4)
+            sources.append((geom_key, dae_path, transform, counts))
 
-        if not merged_meshes:
+        if not sources:
             raise Exception("Assembly resulted in 0 meshes. No valid parts found.")
-        
-        # 5. Concatenate meshes
-        log_progress(4, 5, f"Combining {len(merged_meshes)} sub-meshes into single model...")
-        if len(merged_meshes) == 1:
-            final_mesh = merged_meshes[0]
-        else:
-            final_mesh = trimesh.util.concatenate(merged_meshes)
-        
-        # 5b. Auto-center the mesh (translate so bounding box center is at origin)
-        bounds = final_mesh.bounds  # [[min_x, min_y, min_z], [max_x, max_y, max_z]]
-        center = (bounds[0] + bounds[1]) / 2
-        final_mesh.apply_translation(-center)
-        
-        # 6. Apply rotation for export (Z-up to Y-up)
-        rotation = trimesh.transformations.rotation_matrix(
-            angle=np.radians(-90),
-            direction=[1, 0, 0],
-            point=[0, 0, 0]
-        )
-        final_mesh.apply_transform(rotation)
-        
-        # Force matte white material for clean 3D print preview
-        final_mesh.visual = trimesh.visual.ColorVisuals(final_mesh, face_colors=[200, 200, 200, 255])
-        
-        log_progress(5, 5, f"Exporting final mesh ({len(final_mesh.vertices):,} vertices, {len(final_mesh.faces):,} faces)...")
-        
-        # 7. Export OBJ and GLB
-        final_obj_path = export_path / f"{safe_name_clean}.obj"
-        final_glb_path = export_path / f"{safe_name_clean}.glb"
-        
-        final_mesh.export(str(final_obj_path))
-        
-        # --- POST-PROCESS: Force Strip Materials for 3D Printing ---
-        try:
-            if final_obj_path.exists():
-                lines = final_obj_path.read_text().splitlines()
-                # Remove mtllib and usemtl lines
-                clean_lines = [l for l in lines if not l.startswith(('mtllib', 'usemtl'))]
-                final_obj_path.write_text('\n'.join(clean_lines))
-                # Delete the .mtl file if it was created
-                mtl_path = final_obj_path.with_suffix('.mtl')
-                if mtl_path.exists():
-                    mtl_path.unlink()
-                print(f"[Blueprint Export] Cleaned OBJ: Stripped material/texture references.")
-        except Exception as e:
-            print(f"  Warning: Failed to clean OBJ materials: {e}")
-        # ------------------------------------------------------------
-        
+
+        # 5. Merge: output arrays allocated once, each part copied in (transformed) and freed
+        total_vertices = sum(counts[0] for *_, counts in sources)
+        total_faces = sum(counts[1] for *_, counts in sources)
+        output_bytes = (total_vertices + total_faces) * 12
+        memmap_dir = MERGE_DIR if output_bytes > MERGE_MEMMAP_BYTES else None
+        log_progress(4, 5, f"Merging {len(sources)} parts (up to {total_vertices:,} vertices, {total_faces:,} faces, "
+                           f"{output_bytes / (1024 * 1024):.0f} MB{' memory-mapped' if memmap_dir else ''})...")
+        merger = MeshMerger(total_vertices, total_faces, memmap_dir)
         try:
-            final_mesh.export(str(final_glb_path))
-        except Exception as e:
-            print(f"[Blueprint Export] GLB export failed: {e}")
+            for geom_key, dae_path, transform, _ in sources:
+                try:
+                    scene = load_part(geom_key, dae_path)
+                    if scene is None:
+                        print(f"  [Warning] Part could not be loaded again: {geom_key}")
+                        continue
+                    vertices, faces = scene.combined()
+                    scene = None
+                    merger.append(*merge_duplicate_vertices(vertices, faces), transform)
+                except Exception as e:
+                    print(f"  [Error] Failed to load/transform {geom_key}: {e}")
+                finally:
+                    scene = vertices = faces = None
+
+            if not merger.face_count:
+                raise Exception("Assembly resulted in 0 meshes. No valid parts found.")
+
+            # 5b. Auto-center the mesh (bounding box center to origin), then
+            # 6. rotate for export (Z-up to Y-up), in one pass over the merged vertices
+            rotation = trimesh.transformations.rotation_matrix(
+                angle=np.radians(-90),
+                direction=[1, 0, 0],
+                point=[0, 0, 0]
+            )
+            center = merger.bounds.mean(axis=0)
+            merger.apply_transform(rotation @ trimesh.transformations.translation_matrix(-center))
+            vertices, faces = merger.result()
+
+            log_progress(5, 5, f"Exporting final mesh ({len(vertices):,} vertices, {len(faces):,} faces)...")
+
+            # 7. Export the print model (OBJ/STL/3MF) and GLB
+            final_glb_path = export_path / f"{safe_name_clean}.glb"
+
+            # Geometry only: no mtllib/usemtl lines and no .mtl for slicers to go looking for
+            final_model_path = write_mesh(export_path / safe_name_clean, vertices, faces, export_format)
+
+            try:
+                # Matte light grey for a clean 3D print preview
+                write_glb(final_glb_path, vertices, faces, color=(200, 200, 200, 255))
+            except Exception as e:
+                print(f"[Blueprint Export] GLB export failed: {e}")
+            try:
+                save_export_mesh(final_glb_path, vertices, faces)
+            except Exception as e:
+                print(f"[Blueprint Export] Mesh array export failed: {e}")
+            merge_report = {
+                "parts": merger.parts,
+                "vertices": len(vertices),
+                "faces": len(faces),
+                "memory_mapped": merger.memory_mapped,
+            }
+        finally:
+            vertices = faces = None
+            merger.close()
         
         elapsed = time.time() - start_time
-        print(f"[Blueprint Export] [{elapsed:6.1f}s] COMPLETE! OBJ: {final_obj_path.stat().st_size:,} bytes")
+        print(f"[Blueprint Export] [{elapsed:6.1f}s] COMPLETE! {export_format.upper()}: {final_model_path.stat().st_size:,} bytes")
         
         return {
             "status": "success",
             "name": record.name,
-            "output_file": str(final_obj_path),
+            "output_file": str(final_model_path),
             "preview_url": f"/api/download/{safe_name_clean}/{final_glb_path.name}" if final_glb_path.exists() else None,
-            "download_url": f"/api/download/{safe_name_clean}/{final_obj_path.name}"
+            "download_url": f"/api/download/{safe_name_clean}/{final_model_path.name}",
+            "conversion": conversion_report,
+            "merge": merge_report,
         }
 
 manager = SCManager()
@@ -1181,15 +1724,20 @@ async def get_status():
         "configured": manager.is_ready(),
         "sc_path": manager.sc_path,
         "version": manager.sc.version_label if manager.sc else None,
-        "loading": manager.loading
+        "loading": manager.loading,
+        "load": manager.load_status,
+        "geometry_dedup": manager.geometry_status,
     }
 
 @app.post("/api/set-path")
 async def set_path(request: PathRequest):
     print(f"Setting path to: {request.path}")
     try:
-        await asyncio.to_thread(manager.load_sc, request.path)
-        return {"status": "ok", "sc_path": manager.sc_path}
+        # Returns immediately; the frontend polls /api/status for phase progress
+        manager.start_load(request.path)
+        return {"status": "loading", "sc_path": request.path}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Failed to set path: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -1205,6 +1753,7 @@ import io
 # ... (Existing code)
 
 # Helper for thumbnail extraction
+@holds_datacore
 def _extract_thumbnail(manager, record_id: str) -> Optional[Path]:
     """Extracts and converts thumbnail for a record."""
     if not manager.sc: return None
@@ -1253,15 +1802,19 @@ def _extract_thumbnail(manager, record_id: str) -> Optional[Path]:
             
             image_data = None
             for path in final_candidates:
+                 info = manager.p4k_index.get(path)
+                 if info is None:
+                     continue
                  try:
-                     image_data = manager.sc.p4k.read(path)
+                     # Stored .dds/.tif icons come back as a view into the mapped archive (no copy)
+                     image_data = manager.p4k_reader.read(info)
                      if image_data: break
-                 except:
+                 except Exception:
                      pass
                      
             if image_data:
-                # Convert using PIL
-                img = Image.open(io.BytesIO(image_data))
+                # Convert using PIL (decoded straight from the buffer)
+                img = Image.open(BufferReader(image_data))
                 cache_path.parent.mkdir(parents=True, exist_ok=True)
                 img.save(cache_path, "PNG")
                 return cache_path
@@ -1338,6 +1891,17 @@ async def get_thumbnail(item_id: str):
         # No thumbnail exists - return 404, let frontend show placeholder icon
         raise HTTPException(status_code=404, detail="No thumbnail")
 
+def _share_thumbnail(thumb_path: Path, item: Dict[str, Any]):
+    """Copy a representative's thumbnail to records sharing its geometry (they'd render identically)"""
+    for alias in item.get('aliases', []):
+        alias_path = CACHE_DIR / f"{alias['id']}.png"
+        if alias_path.exists() and alias_path.stat().st_size > 5000:
+            continue
+        try:
+            shutil.copyfile(thumb_path, alias_path)
+        except OSError as e:
+            print(f"  Failed to copy thumbnail to alias {alias['id']}: {e}")
+
 class ThumbnailGenerateRequest(BaseModel):
     path: str  # Category path like "entities/scitem/characters/human/armor"
 
@@ -1348,69 +1912,73 @@ async def generate_thumbnails_for_category(request: ThumbnailGenerateRequest):
         raise HTTPException(status_code=400, detail="SC not loaded")
     
     path = request.path
-    items = manager.get_items_by_path(path)
+    items = manager.get_items_by_path(path, limit=None)
     
     generated = 0
     failed = 0
     skipped = 0
     
-    for item in items:
-        item_id = item.get('id')
-        if not item_id:
-            continue
+    # One DataCore for the whole batch: each export parses it only if nobody holds it
+    with manager._using_datacore(load=False):
+        for item in items:
+            item_id = item.get('id')
+            if not item_id:
+                continue
         
-        # Check if we already have a REAL thumbnail (not just placeholder)
-        thumb_path = CACHE_DIR / f"{item_id}.png"
+            # Check if we already have a REAL thumbnail (not just placeholder)
+            thumb_path = CACHE_DIR / f"{item_id}.png"
         
-        # Check if a real GLB-based thumbnail exists (skip if it does)
-        # We mark real thumbnails by size > 5KB (placeholders are ~2KB)
-        if thumb_path.exists() and thumb_path.stat().st_size > 5000:
-            skipped += 1
-            continue
+            # Check if a real GLB-based thumbnail exists (skip if it does)
+            # We mark real thumbnails by size > 5KB (placeholders are ~2KB)
+            if thumb_path.exists() and thumb_path.stat().st_size > 5000:
+                _share_thumbnail(thumb_path, item)
+                skipped += 1
+                continue
         
-        # Step 1: Export the item to GLB
-        print(f"[Thumbnail] Exporting: {item.get('name', item_id)}")
-        try:
-            # Use export_item_blueprint which handles routing to correct export method
-            export_result = await asyncio.to_thread(manager.export_item_blueprint, item_id)
+            # Step 1: Export the item to GLB
+            print(f"[Thumbnail] Exporting: {item.get('name', item_id)}")
+            try:
+                # Use export_item_blueprint which handles routing to correct export method
+                export_result = await asyncio.to_thread(manager.export_item_blueprint, item_id)
             
-            if export_result.get('status') != 'success':
-                print(f"  Export failed: {export_result.get('message', 'Unknown error')}")
-                failed += 1
-                continue
+                if export_result.get('status') != 'success':
+                    print(f"  Export failed: {export_result.get('message', 'Unknown error')}")
+                    failed += 1
+                    continue
             
-            # Step 2: Find the GLB file
-            output_file = export_result.get('output_file', '')
-            if output_file:
-                glb_path = Path(output_file).with_suffix('.glb')
-                if not glb_path.exists():
-                    # Try finding it in the export directory
-                    export_dir = Path(output_file).parent
-                    glb_files = list(export_dir.glob('*.glb'))
-                    if glb_files:
-                        glb_path = glb_files[0]
+                # Step 2: Find the GLB file
+                output_file = export_result.get('output_file', '')
+                if output_file:
+                    glb_path = Path(output_file).with_suffix('.glb')
+                    if not glb_path.exists():
+                        # Try finding it in the export directory
+                        export_dir = Path(output_file).parent
+                        glb_files = list(export_dir.glob('*.glb'))
+                        if glb_files:
+                            glb_path = glb_files[0]
             
-            if not glb_path or not glb_path.exists():
-                print(f"  No GLB found after export")
-                failed += 1
-                continue
+                if not glb_path or not glb_path.exists():
+                    print(f"  No GLB found after export")
+                    failed += 1
+                    continue
             
-            # Step 3: Render GLB to thumbnail
-            print(f"  Rendering thumbnail from: {glb_path.name}")
-            thumb = generate_thumbnail(glb_path, item_id)
+                # Step 3: Render GLB to thumbnail
+                print(f"  Rendering thumbnail from: {glb_path.name}")
+                thumb = generate_thumbnail(glb_path, item_id)
             
-            if thumb and thumb.exists():
-                generated += 1
-                print(f"  ✓ Thumbnail created: {thumb.name}")
-            else:
-                failed += 1
-                print(f"  ✗ Thumbnail render failed")
+                if thumb and thumb.exists():
+                    generated += 1
+                    print(f"  ✓ Thumbnail created: {thumb.name}")
+                    _share_thumbnail(thumb, item)
+                else:
+                    failed += 1
+                    print(f"  ✗ Thumbnail render failed")
                 
-        except Exception as e:
-            print(f"  Exception: {e}")
-            import traceback
-            traceback.print_exc()
-            failed += 1
+            except Exception as e:
+                print(f"  Exception: {e}")
+                import traceback
+                traceback.print_exc()
+                failed += 1
     
     return {
         "status": "complete",
@@ -1426,7 +1994,7 @@ async def get_thumbnail_status(category_path: str):
     if not manager.is_ready():
         return {"has_thumbnails": False, "count": 0, "total": 0}
     
-    items = manager.get_items_by_path(category_path)
+    items = manager.get_items_by_path(category_path, limit=None)
     total = len(items)
     with_thumbnails = 0
     
@@ -1443,12 +2011,23 @@ async def get_thumbnail_status(category_path: str):
 
 # (Update search/list to include thumbnail link)
 
+def _page_info(offset: int, count: int, total: int) -> Dict[str, Any]:
+    """Paging fields shared by /api/items and /api/search"""
+    next_offset = offset + count
+    return {
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
 @app.get("/api/items/{category_path:path}")
-async def get_items(category_path: str):
+async def get_items(category_path: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE):
     if not manager.is_ready():
-        return {"items": []}
+        return {"items": [], "total": 0, "offset": 0, "next_offset": None}
     
-    items = await asyncio.to_thread(manager.get_items_by_path, category_path)
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    items = await asyncio.to_thread(manager.get_items_by_path, category_path, offset, limit)
     # Post-process to add thumbnail URL if icon exists
     for item in items:
         # We don't want to check file existence here (too slow), just check if valid
@@ -1456,26 +2035,34 @@ async def get_items(category_path: str):
         # Actually, let's just assume we return the URL and let the frontend fetch result in 404 -> Default
         item['thumbnail'] = f"/api/thumbnail/{item['id']}"
         
-    return {"items": items}
+    total = manager.count_items_by_path(category_path)
+    return {"items": items, **_page_info(offset, len(items), total)}
 
 @app.get("/api/search")
-async def search(q: str):
+async def search(q: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE):
     if not manager.is_ready():
-        return {"results": []}
-    items = await asyncio.to_thread(manager.search_items, q)
+        return {"results": [], "total": 0, "offset": 0, "next_offset": None}
+    
+    offset = max(offset, 0)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    items = await asyncio.to_thread(manager.search_items, q, offset, limit)
     for item in items:
         item['thumbnail'] = f"/api/thumbnail/{item['id']}"
-    return {"results": items}
+    total = manager.count_search_results(q)
+    return {"results": items, **_page_info(offset, len(items), total)}
 
 
 @app.get("/api/export/{item_id}")
-async def export_item(item_id: str):
+async def export_item(item_id: str, format: str = "obj"):
     if not manager.is_ready():
         raise HTTPException(status_code=400, detail="SC not loaded")
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}' (use one of: {', '.join(EXPORT_FORMATS)})")
     
     try:
         # Use the new Blueprint API method for complete exports (including landing gear)
-        result = await asyncio.to_thread(manager.export_item_blueprint, item_id)
+        result = await asyncio.to_thread(manager.export_item_blueprint, item_id, export_format)
         return result
     except Exception as e:
         print(f"Export failed: {e}")
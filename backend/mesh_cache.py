@@ -0,0 +1,186 @@
+"""
+StarPrint Parsed-Mesh Cache
+Converted parts parsed once: each DAE's geometry and node tree is stored as an
+uncompressed .npz keyed by the DAE's content hash, and later exports memory-map the
+arrays straight out of that file instead of parsing XML again.
+
+The same format holds finished exports (<name>.mesh.npz next to the .glb), which is
+what thumbnail rendering reads.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .dae_reader import read_dae, DaeScene
+except ImportError:
+    from dae_reader import read_dae, DaeScene
+
+# Bump when the stored arrays change meaning
+MESH_FORMAT_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def save_mesh_arrays(path: Path, arrays: Dict[str, np.ndarray]):
+    """Write arrays as an uncompressed .npz (stored members can be memory-mapped)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def load_mesh_arrays(path: Path) -> Dict[str, np.ndarray]:
+    """
+    Arrays of a .npz written by save_mesh_arrays, as read-only views into one memory map
+    of the file. Falls back to a regular np.load for members that aren't stored plainly.
+    """
+    path = Path(path)
+    arrays = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as zf:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if path.stat().st_size else None
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED or mapped is None:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            # Local file header: name and extra field lengths at +26, data after them
+            name_len, extra_len = struct.unpack_from("<HH", mapped, info.header_offset + 26)
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            count = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(mapped, dtype=dtype, count=count, offset=f.tell())
+            arrays[name] = array.reshape(shape, order="F" if fortran else "C")
+    return arrays
+
+
+def export_mesh_path(model_path: Path) -> Path:
+    """Where an export keeps its final arrays: <name>.mesh.npz next to <name>.obj/.glb"""
+    return Path(model_path).with_suffix(".mesh.npz")
+
+
+def save_export_mesh(model_path: Path, vertices, faces):
+    """Store an export's final merged mesh for thumbnail rendering"""
+    save_mesh_arrays(export_mesh_path(model_path), {
+        "vertices": np.asarray(vertices, dtype=np.float32),
+        "faces": np.asarray(faces, dtype=np.uint32),
+    })
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MeshCache:
+    """
+    Parsed DAE geometry under root/<ab>/<sha1>.npz, keyed by the DAE's content. Evicted
+    least-recently-used past max_bytes, with the file mtime as recency (touched on every
+    hit), like the ConvertedPartCache next to it.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (path, size, mtime) -> content hash, so a file is hashed once per process
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._entries: Optional[OrderedDict] = None  # key -> size, oldest first (scanned lazily)
+        self._total = 0
+
+    def key(self, dae_path: Path) -> str:
+        st = os.stat(dae_path)
+        memo = (str(Path(dae_path).resolve()), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(memo)
+        if cached is None:
+            cached = hashlib.sha1(f"{file_hash(dae_path)}|{MESH_FORMAT_VERSION}".encode()).hexdigest()
+            with self._lock:
+                self._hashes[memo] = cached
+        return cached
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npz"
+
+    def _scan(self):
+        if self._entries is not None:
+            return
+        found = []
+        if self.root.exists():
+            for path in self.root.glob("*/*.npz"):
+                st = path.stat()
+                found.append((st.st_mtime, path.stem, st.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total = sum(self._entries.values())
+
+    def _touch(self, key: str, path: Path):
+        with self._lock:
+            self._scan()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _added(self, key: str, path: Path):
+        size = path.stat().st_size
+        with self._lock:
+            self._scan()
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        # Keep at least the newest entry even if it alone exceeds the budget
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self.path_for(key).unlink(missing_ok=True)
+            except OSError:
+                pass  # Still memory-mapped by an export (Windows); the next scan finds it again
+
+    def size(self) -> int:
+        with self._lock:
+            self._scan()
+            return self._total
+
+    def load(self, dae_path: Path) -> DaeScene:
+        """DaeScene of a DAE: memory-mapped from the cache, or parsed and then cached"""
+        key = self.key(dae_path)
+        path = self.path_for(key)
+        if path.exists():
+            try:
+                scene = DaeScene.from_arrays(load_mesh_arrays(path))
+                self._touch(key, path)
+                return scene
+            except Exception as e:
+                print(f"Warning: Discarding unreadable mesh cache entry {path.name}: {e}")
+        scene = read_dae(dae_path)
+        try:
+            save_mesh_arrays(path, scene.to_arrays())
+            self._added(key, path)
+        except OSError as e:
+            print(f"Warning: Could not cache parsed mesh for {Path(dae_path).name}: {e}")
+        return scene
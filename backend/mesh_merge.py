@@ -0,0 +1,125 @@
+"""
+StarPrint Out-of-Core Merge
+Builds one big mesh from many parts without ever holding them all: the caller sizes
+every part first, the output arrays are allocated once (in RAM, or as memory-mapped
+files past a size limit), and each part's transformed vertices and offset faces are
+copied in and dropped. Peak memory is the largest part plus the output arrays.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Rows transformed per step when moving the merged vertices in place
+TRANSFORM_BLOCK_ROWS = 1 << 20
+
+
+def merge_duplicate_vertices(vertices: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collapse vertices with identical positions (converter output splits them at every
+    normal/UV seam), so each part comes out connected the way trimesh's processing left it.
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+    if not len(vertices):
+        return vertices, faces
+    rows = vertices.view(np.dtype((np.void, vertices.dtype.itemsize * 3))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    if len(first) == len(vertices):
+        return vertices, faces
+    # Keep first-seen order, like trimesh's merge
+    order = np.argsort(first, kind="stable")
+    remap = np.empty(len(first), dtype=np.uint32)
+    remap[order] = np.arange(len(first), dtype=np.uint32)
+    return vertices[first[order]], remap[inverse.ravel()][faces]
+
+
+class MeshMerger:
+    """Preallocated float32 vertex / uint32 face arrays that parts are appended into"""
+
+    def __init__(self, vertex_count: int, face_count: int, memmap_dir: Optional[Path] = None):
+        if vertex_count > 0xFFFFFFFF:
+            raise ValueError(f"Too many vertices for uint32 faces: {vertex_count}")
+        self.files = []
+        if memmap_dir is not None:
+            memmap_dir = Path(memmap_dir)
+            memmap_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"merge_{os.getpid()}_{threading.get_ident()}"
+            self.files = [memmap_dir / f"{stem}_vertices.npy", memmap_dir / f"{stem}_faces.npy"]
+            self.vertices = np.lib.format.open_memmap(self.files[0], mode="w+", dtype=np.float32,
+                                                      shape=(vertex_count, 3))
+            self.faces = np.lib.format.open_memmap(self.files[1], mode="w+", dtype=np.uint32,
+                                                   shape=(face_count, 3))
+        else:
+            self.vertices = np.empty((vertex_count, 3), dtype=np.float32)
+            self.faces = np.empty((face_count, 3), dtype=np.uint32)
+        self.vertex_count = 0
+        self.face_count = 0
+        self.parts = 0
+        self.lower = np.full(3, np.inf)
+        self.upper = np.full(3, -np.inf)
+
+    @property
+    def memory_mapped(self) -> bool:
+        return bool(self.files)
+
+    def append(self, vertices: np.ndarray, faces: np.ndarray, transform: Optional[np.ndarray] = None):
+        """
+        Copy one part in: vertices through transform (4x4), faces offset past what's there
+        (and reversed if the transform mirrors, so the part isn't turned inside out)
+        """
+        n, m = len(vertices), len(faces)
+        if self.vertex_count + n > len(self.vertices) or self.face_count + m > len(self.faces):
+            raise ValueError("Part is larger than its sizing pass said")
+        out = self.vertices[self.vertex_count:self.vertex_count + n]
+        if transform is not None and not np.allclose(transform, np.eye(4)):
+            transform = np.asarray(transform, dtype=np.float64)
+            out[:] = vertices @ transform[:3, :3].T + transform[:3, 3]
+            if np.linalg.det(transform[:3, :3]) < 0:
+                faces = np.asarray(faces)[:, ::-1]
+        else:
+            out[:] = vertices
+        np.add(faces, self.vertex_count, out=self.faces[self.face_count:self.face_count + m], casting="unsafe")
+        if n:
+            np.minimum(self.lower, out.min(axis=0), out=self.lower)
+            np.maximum(self.upper, out.max(axis=0), out=self.upper)
+        self.vertex_count += n
+        self.face_count += m
+        self.parts += 1
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return np.array([self.lower, self.upper])
+
+    def apply_transform(self, matrix: np.ndarray):
+        """Transform the merged vertices in place (a block at a time); mirroring also flips the faces"""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        vertices = self.vertices[:self.vertex_count]
+        if np.linalg.det(matrix[:3, :3]) < 0:
+            faces = self.faces[:self.face_count]
+            for start in range(0, len(faces), TRANSFORM_BLOCK_ROWS):
+                block = faces[start:start + TRANSFORM_BLOCK_ROWS]
+                block[:, [0, 2]] = block[:, [2, 0]]
+        self.lower = np.full(3, np.inf)
+        self.upper = np.full(3, -np.inf)
+        for start in range(0, len(vertices), TRANSFORM_BLOCK_ROWS):
+            block = vertices[start:start + TRANSFORM_BLOCK_ROWS]
+            block[:] = block @ matrix[:3, :3].T + matrix[:3, 3]
+            np.minimum(self.lower, block.min(axis=0), out=self.lower)
+            np.maximum(self.upper, block.max(axis=0), out=self.upper)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The merged (vertices, faces): views of what has been appended so far"""
+        return self.vertices[:self.vertex_count], self.faces[:self.face_count]
+
+    def close(self):
+        """Release the arrays (and their backing files). Drop any result() views first."""
+        self.vertices = self.faces = None
+        for path in self.files:
+            try:
+                path.unlink()
+            except OSError as e:
+                print(f"Warning: Could not remove merge file {path.name}: {e}")
+        self.files = []
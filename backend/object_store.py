@@ -0,0 +1,128 @@
+"""
+StarPrint Object Store
+Content-addressed cache of extracted P4K entries. Each entry is written once, keyed by
+its archive path + CRC + size, and export directories get hardlinks (or reflinks) to
+it, so parts shared between items cost no extra extraction I/O or disk space.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    from .extraction import extract_entry
+except ImportError:
+    from extraction import extract_entry
+
+# Linux FICLONE ioctl (copy-on-write clone on btrfs/xfs), used when hardlinking fails
+FICLONE = 0x40049409
+
+
+def object_key(info) -> str:
+    """Store key of an archive entry: changes whenever the entry's content changes"""
+    raw = f"{info.filename.lower()}|{info.CRC:08x}|{info.file_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except (OSError, ImportError):
+        dest.unlink(missing_ok=True)
+        return False
+
+
+def link_file(src: Path, dest: Path) -> str:
+    """
+    Place src at dest: hardlink, else reflink, else copy.
+    Returns the method used ("existing" if dest already is src).
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        if os.path.samefile(src, dest):
+            return "existing"
+        dest.unlink()
+
+    try:
+        os.link(src, dest)
+        return "hardlink"
+    except OSError:
+        pass
+    if _reflink(src, dest):
+        return "reflink"
+    shutil.copyfile(src, dest)
+    return "copy"
+
+
+class ObjectStore:
+    """Extract-once storage under root/<ab>/<sha1><ext>, materialized into export trees by link"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, info) -> Path:
+        key = object_key(info)
+        # Keep the extension: the converter picks its parser from it when reading a linked file
+        return self.root / key[:2] / f"{key}{Path(info.filename).suffix.lower()}"
+
+    def contains(self, info) -> bool:
+        path = self.path_for(info)
+        return path.exists() and path.stat().st_size == info.file_size
+
+    def ensure(self, p4k, info) -> int:
+        """Extract the entry into the store if missing. Returns bytes extracted (0 on a hit)."""
+        if self.contains(info):
+            return 0
+        return extract_entry(p4k, info, self.path_for(info))
+
+    def materialize(self, info, dest: Path) -> str:
+        """
+        Place the stored entry at dest: hardlink, else reflink, else copy.
+        Returns the method used ("existing" if dest already is the stored file).
+        """
+        return link_file(self.path_for(info), dest)
+
+    def adopt(self, info, path: Path) -> bool:
+        """
+        Deduplicate a file something else already extracted (e.g. scdatatools' blueprint
+        extraction): move it into the store, or link to the stored copy if there is one.
+        """
+        path = Path(path)
+        if not path.exists() or path.stat().st_size != info.file_size:
+            return False
+        stored = self.path_for(info)
+        if stored.exists() and os.path.samefile(stored, path):
+            return False
+        if not stored.exists():
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, stored)
+                return True
+            except OSError:
+                return False
+        self.materialize(info, path)
+        return True
+
+    def adopt_tree(self, p4k_index, root: Path) -> int:
+        """Adopt every file under root whose relative path is an archive entry. Returns files deduplicated."""
+        root = Path(root)
+        adopted = 0
+        for path in root.rglob("*"):
+            if not path.is_file():
+                continue
+            info = p4k_index.get(path.relative_to(root).as_posix())
+            if info is not None and self.adopt(info, path):
+                adopted += 1
+        return adopted
+
+    def size(self) -> int:
+        """Total bytes held by the store"""
+        return sum(f.stat().st_size for f in self.root.rglob("*") if f.is_file())
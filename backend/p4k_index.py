@@ -0,0 +1,95 @@
+"""
+StarPrint P4K Path Index
+One pass over Data.p4k's file list, so export and assembly lookups are dict hits
+instead of fnmatch globs over every entry in the archive.
+"""
+
+import posixpath
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+def normalize_path(path: str) -> str:
+    """Lowercase posix form of an archive path ("Data\\Objects\\x.cgf" -> "data/objects/x.cgf")"""
+    return str(path).replace("\\", "/").strip("/").lower()
+
+
+class P4KIndex:
+    """
+    Lookups over the archive file list:
+      - lowercase full path -> entry (reuses the archive's own NameToInfoLower table)
+      - directory -> files directly in it, and directory -> subdirectories
+      - lowercase basename -> entries with that name, in archive order
+
+    Paths are matched case-insensitively and may omit the leading "Data/", since
+    geometry paths coming out of the DataCore and CDF files are inconsistent about it.
+    """
+
+    def __init__(self, p4k):
+        self.p4k = p4k
+        self._by_path: Dict = p4k.NameToInfoLower
+        files_by_dir = defaultdict(list)
+        subdirs = defaultdict(set)
+        by_basename = defaultdict(list)
+
+        for name_lower, info in self._by_path.items():
+            dir_path, basename = posixpath.split(name_lower)
+            files_by_dir[dir_path].append(info)
+            by_basename[basename].append(info)
+            # Register the directory chain up to the root (stops at the first one already known)
+            while dir_path and dir_path not in subdirs:
+                parent = posixpath.dirname(dir_path)
+                subdirs[dir_path]   # make sure the directory itself is known
+                subdirs[parent].add(dir_path)
+                dir_path = parent
+
+        self._files_by_dir: Dict[str, List] = dict(files_by_dir)
+        self._subdirs: Dict[str, List[str]] = {d: sorted(s) for d, s in subdirs.items()}
+        self._by_basename: Dict[str, List] = dict(by_basename)
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def _resolve(self, path: str, table: Dict) -> Optional[str]:
+        """Key of path in table, trying it with and without the "data/" prefix"""
+        key = normalize_path(path)
+        if key in table:
+            return key
+        if not key.startswith("data/") and f"data/{key}" in table:
+            return f"data/{key}"
+        return None
+
+    def get(self, path: str):
+        """Archive entry for a file path, or None"""
+        key = self._resolve(path, self._by_path)
+        return self._by_path[key] if key else None
+
+    def exists(self, path: str) -> bool:
+        return self._resolve(path, self._by_path) is not None
+
+    def listdir(self, dir_path: str) -> List:
+        """Files directly inside a directory"""
+        key = self._resolve(dir_path, self._subdirs)
+        return list(self._files_by_dir.get(key, ())) if key else []
+
+    def walk(self, dir_path: str) -> List:
+        """Every file at or below a directory (what a "{dir}/*" glob matched)"""
+        key = self._resolve(dir_path, self._subdirs)
+        if not key:
+            return []
+        result = []
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            result.extend(self._files_by_dir.get(current, ()))
+            stack.extend(reversed(self._subdirs.get(current, ())))
+        return result
+
+    def find_basename(self, basename: str, under: str = "data/") -> List:
+        """Entries named basename (case-insensitive) anywhere below a directory prefix"""
+        prefix = normalize_path(under)
+        prefix = f"{prefix}/" if prefix else ""
+        return [
+            info for info in self._by_basename.get(basename.lower(), ())
+            if info.filename.lower().startswith(prefix)
+        ]
@@ -0,0 +1,135 @@
+"""
+StarPrint Memory-Mapped P4K Reader
+Serves Data.p4k entries straight out of a read-only memory map instead of through
+p4k.read(), which allocates a fresh bytes object (and a locked seek) per entry.
+
+- Stored (uncompressed) entries come back as memoryviews into the map: no copy at all.
+- zstd entries decompress from the map straight into one buffer of the entry's size,
+  owned by the caller (no intermediate bytes object, nothing shared between reads).
+- Anything else (encrypted, sub-archive, other codecs) falls back to the P4KFile.
+"""
+
+import io
+import mmap
+import struct
+import zipfile
+from typing import Optional
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# P4K uses zstd as ZIP compression method 100
+ZIP_ZSTD = 100
+
+# Local file header: filename length at +26, extra field length at +28
+LOCAL_HEADER_SIZE = 30
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only file object over a buffer, without copying the buffer"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class MappedP4K:
+    """Memory-mapped reads over an open P4KFile (which still resolves names and handles fallbacks)"""
+
+    def __init__(self, p4k):
+        self.p4k = p4k
+        self._file = open(p4k.filename, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def close(self):
+        try:
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            pass  # Views handed out are still alive; the map goes away with them
+        self._file.close()
+
+    def _info(self, name_or_info):
+        if isinstance(name_or_info, zipfile.ZipInfo):
+            return name_or_info
+        return self.p4k.getinfo(name_or_info)
+
+    def is_mapped(self, info) -> bool:
+        """True if the entry can be served from the map (not encrypted, not inside a sub-archive)"""
+        if getattr(info, "subinfo", None) is not None or getattr(info, "is_encrypted", False):
+            return False
+        if info.compress_type == zipfile.ZIP_STORED:
+            return True
+        return info.compress_type == ZIP_ZSTD and zstd is not None
+
+    def raw_view(self, info) -> memoryview:
+        """The entry's bytes as stored in the archive (compressed if it is compressed)"""
+        offset = info.header_offset
+        name_len, extra_len = struct.unpack_from("<HH", self._map, offset + 26)
+        start = offset + LOCAL_HEADER_SIZE + name_len + extra_len
+        return self._view[start:start + info.compress_size]
+
+    def stored_view(self, name_or_info) -> Optional[memoryview]:
+        """Zero-copy view of an uncompressed entry, or None if it has to be decompressed"""
+        info = self._info(name_or_info)
+        if self.is_mapped(info) and info.compress_type == zipfile.ZIP_STORED:
+            return self.raw_view(info)
+        return None
+
+    def read(self, name_or_info) -> memoryview:
+        """
+        Entry contents as a memoryview: into the map for stored entries, otherwise over
+        a buffer allocated for this read alone (safe to keep across later reads).
+        """
+        info = self._info(name_or_info)
+        if not self.is_mapped(info):
+            return memoryview(self.p4k.read(info))
+        raw = self.raw_view(info)
+        if info.compress_type == zipfile.ZIP_STORED:
+            return raw
+
+        out = memoryview(bytearray(info.file_size))
+        filled = 0
+        with zstd.ZstdDecompressor().stream_reader(raw) as reader:
+            while filled < info.file_size:
+                n = reader.readinto(out[filled:])
+                if not n:
+                    break
+                filled += n
+        return out[:filled]
+
+    def open(self, name_or_info):
+        """Streaming file object for an entry (decompresses incrementally from the map)"""
+        info = self._info(name_or_info)
+        if not self.is_mapped(info):
+            return self.p4k.open(info)
+        raw = self.raw_view(info)
+        if info.compress_type == zipfile.ZIP_STORED:
+            return BufferReader(raw)
+        return zstd.ZstdDecompressor().stream_reader(raw)
@@ -9,6 +9,11 @@ from pathlib import Path
 from PIL import Image, ImageDraw
 import io
 
+try:
+    from .mesh_cache import export_mesh_path, load_mesh_arrays
+except ImportError:
+    from mesh_cache import export_mesh_path, load_mesh_arrays
+
 # Thumbnail settings
 THUMBNAIL_SIZE = (256, 256)
 THUMBNAIL_DIR = Path(__file__).parent.parent / "cache"  # Same as CACHE_DIR in main.py
@@ -25,6 +30,18 @@ def thumbnail_exists(guid: str) -> bool:
     """Check if thumbnail already exists in cache"""
     return get_thumbnail_path(guid).exists()
 
+def load_export_mesh(glb_path: Path) -> trimesh.Trimesh | None:
+    """The export's final mesh from its memory-mapped .mesh.npz, or None if there isn't one"""
+    mesh_path = export_mesh_path(glb_path)
+    if not mesh_path.exists():
+        return None
+    try:
+        arrays = load_mesh_arrays(mesh_path)
+        return trimesh.Trimesh(arrays["vertices"], arrays["faces"], process=False)
+    except Exception as e:
+        print(f"[Thumbnail] Mesh arrays unusable ({e}), loading GLB instead")
+        return None
+
 def generate_thumbnail(glb_path: Path, guid: str) -> Path | None:
     """
     Generate a PNG thumbnail from a GLB file using 2D silhouette projection.
@@ -40,26 +57,30 @@ def generate_thumbnail(glb_path: Path, guid: str) -> Path | None:
     thumbnail_path = get_thumbnail_path(guid)
     
     try:
-        # Load the GLB file
-        scene = trimesh.load(str(glb_path), force='scene')
-        
-        if scene is None:
-            print(f"[Thumbnail] Could not load: {glb_path}")
-            return create_placeholder_thumbnail(guid, "Load Error")
+        # Exports leave their final arrays next to the GLB; map those instead of parsing it
+        mesh = load_export_mesh(glb_path)
         
-        # Get combined mesh from scene
-        if isinstance(scene, trimesh.Trimesh):
-            mesh = scene
-        elif hasattr(scene, 'geometry') and len(scene.geometry) > 0:
-            # Combine all meshes in scene
-            meshes = list(scene.geometry.values())
-            if len(meshes) == 1:
-                mesh = meshes[0]
+        if mesh is None:
+            # Load the GLB file
+            scene = trimesh.load(str(glb_path), force='scene')
+            
+            if scene is None:
+                print(f"[Thumbnail] Could not load: {glb_path}")
+                return create_placeholder_thumbnail(guid, "Load Error")
+            
+            # Get combined mesh from scene
+            if isinstance(scene, trimesh.Trimesh):
+                mesh = scene
+            elif hasattr(scene, 'geometry') and len(scene.geometry) > 0:
+                # Combine all meshes in scene
+                meshes = list(scene.geometry.values())
+                if len(meshes) == 1:
+                    mesh = meshes[0]
+                else:
+                    mesh = trimesh.util.concatenate(meshes)
             else:
-                mesh = trimesh.util.concatenate(meshes)
-        else:
-            print(f"[Thumbnail] Empty scene: {glb_path}")
-            return create_placeholder_thumbnail(guid, "Empty")
+                print(f"[Thumbnail] Empty scene: {glb_path}")
+                return create_placeholder_thumbnail(guid, "Empty")
         
         if not isinstance(mesh, trimesh.Trimesh) or len(mesh.vertices) == 0:
             return create_placeholder_thumbnail(guid, "No Mesh")
@@ -10,11 +10,7 @@ def inspect_item(item_name):
     manager.load_sc(sc_path)
 
     print(f"Searching for {item_name}...")
-    found_record = None
-    for record in manager._records_by_guid.values():
-        if record.name == item_name:
-            found_record = record
-            break
+    found_record = manager.get_record_by_name(item_name)
             
     if not found_record:
         print("Item not found.")
@@ -0,0 +1,131 @@
+"""
+Test the batched converter layer against a stand-in converter (no game files or
+cgf-converter needed). Checks that parts are grouped into few converter runs, that a
+failing or hung batch keeps what it finished and reruns only the rest one part per run,
+and that results land in the cache.
+"""
+import sys
+import tempfile
+import time
+import textwrap
+from pathlib import Path
+sys.path.insert(0, ".")
+
+import backend.converter as converter_module
+from backend.converter import PartConverter, ConvertedPartCache, convert_parts
+
+# Behaves like cgf-converter: any number of inputs, writes <input>.dae next to each.
+# Inputs named *crash* abort the whole run when batched, *hang* stall it; *broken* never convert.
+STAND_IN = textwrap.dedent('''
+    import sys
+    import time
+    from pathlib import Path
+    args = sys.argv[1:]
+    inputs = []
+    while args:
+        arg = args.pop(0)
+        if arg == "-objectdir":
+            args.pop(0)
+        elif not arg.startswith("-"):
+            inputs.append(Path(arg))
+    with open(Path(__file__).with_name("calls.txt"), "a") as log:
+        log.write(" ".join(p.name for p in inputs) + "\\n")
+    for src in inputs:
+        if "crash" in src.name and len(inputs) > 1:
+            sys.exit(3)
+        if "hang" in src.name and len(inputs) > 1:
+            time.sleep(60)
+        if "broken" in src.name:
+            continue
+        src.with_suffix(".dae").write_text("<COLLADA>" + "x" * 200 + "</COLLADA>")
+''')
+
+
+class FakeInfo:
+    def __init__(self, filename, crc):
+        self.filename = filename
+        self.CRC = crc
+        self.file_size = 100
+
+
+class FakeIndex:
+    """Every file under Data/ is an archive entry, except companion mesh streams (.cgfm etc.)"""
+
+    def get(self, path):
+        path = path.replace("\\", "/")
+        if not path.lower().startswith("data/") or path.lower().endswith("m"):
+            return None
+        return FakeInfo(path, sum(path.encode()))
+
+
+def calls(tool_dir):
+    log = tool_dir / "calls.txt"
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def make_parts(root, names):
+    parts = []
+    for name in names:
+        path = root / "Data" / "Objects" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"CrCh")
+        parts.append(path)
+    return parts
+
+
+def main():
+    tmp = Path(tempfile.mkdtemp(prefix="starprint_batch_"))
+    tool = tmp / "stand_in_converter.py"
+    tool.write_text(STAND_IN)
+    cache = ConvertedPartCache(tmp / "converted", 10 * 1024 * 1024)
+    converter = PartConverter([sys.executable, str(tool)], cache, FakeIndex(), timeout=30)
+
+    # 1. Plain batch: 12 parts on 2 workers -> 2 converter runs
+    export = tmp / "export_a"
+    parts = make_parts(export, [f"part_{i:02d}.cgf" for i in range(12)])
+    results = convert_parts(converter, parts, export, workers=2)
+    assert all(r.ok for r in results.values()), "all parts should convert"
+    assert len(calls(tmp)) == 2, f"expected 2 converter runs, got {len(calls(tmp))}"
+    print(f"[OK] 12 parts converted in {len(calls(tmp))} converter runs")
+
+    # 2. Same parts in another export: everything comes from the cache
+    export_b = tmp / "export_b"
+    parts_b = make_parts(export_b, [f"part_{i:02d}.cgf" for i in range(12)])
+    results = convert_parts(converter, parts_b, export_b, workers=2)
+    assert all(r.cached for r in results.values()), "second export should be served from the cache"
+    assert len(calls(tmp)) == 2, "cache hits must not run the converter"
+    print("[OK] second export served entirely from the cache")
+
+    # 3. A batch that crashes falls back to single-file runs; broken parts fail cleanly
+    before = len(calls(tmp))
+    export_c = tmp / "export_c"
+    parts_c = make_parts(export_c, ["a.cgf", "crash.cgf", "b.cgf", "broken.cgf"])
+    results = convert_parts(converter, parts_c, export_c, workers=1)
+    ok = sorted(p.name for p, r in results.items() if r.ok)
+    assert ok == ["a.cgf", "b.cgf", "crash.cgf"], ok
+    assert not results[export_c / "Data" / "Objects" / "broken.cgf"].ok
+    # a.cgf was written before the crash, so only the other three get their own run
+    assert len(calls(tmp)) - before == 4, f"expected 1 batch + 3 single runs, got {len(calls(tmp)) - before}"
+    assert results[export_c / "Data" / "Objects" / "a.cgf"].batch == 4, "a.cgf should come from the batch"
+    print(f"[OK] crashed batch kept its finished part, rest retried one by one ({len(calls(tmp)) - before} runs)")
+
+    # 4. A hung batch is killed after timeout + a small per-part allowance, not timeout x parts
+    converter_module.BATCH_TIMEOUT_PER_PART = 0.5
+    quick = PartConverter([sys.executable, str(tool)], cache, FakeIndex(), timeout=2)
+    assert quick.batch_timeout(32) == 2 + 0.5 * 31
+    before = len(calls(tmp))
+    export_d = tmp / "export_d"
+    parts_d = make_parts(export_d, ["c.cgf", "hang.cgf", "d.cgf"])
+    start = time.perf_counter()
+    results = convert_parts(quick, parts_d, export_d, workers=1)
+    seconds = time.perf_counter() - start
+    assert all(r.ok for r in results.values()), "hung batch parts should convert on retry"
+    assert seconds < 20, f"hung batch took {seconds:.1f}s"
+    assert len(calls(tmp)) - before == 3, f"expected 1 batch + 2 single runs, got {len(calls(tmp)) - before}"
+    print(f"[OK] hung batch killed after {seconds:.1f}s, finished part kept, rest retried")
+
+    print(f"All batch converter checks passed ({tmp})")
+
+
+if __name__ == "__main__":
+    main()
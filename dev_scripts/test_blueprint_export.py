@@ -18,14 +18,7 @@ async def test_blueprint_export():
     
     # Find Arrow GUID
     arrow_name = "ANVL_Arrow"
-    arrow_record = None
-    for records in manager._records_by_path.values():
-        for r in records:
-            if r.name == arrow_name:
-                arrow_record = r
-                break
-        if arrow_record:
-            break
+    arrow_record = manager.get_record_by_name(arrow_name)
     
     if not arrow_record:
         print(f"ERROR: Could not find {arrow_name}")
@@ -0,0 +1,124 @@
+"""
+Test the in-process CrCh geometry decoder on synthetic chunk files (no game files needed):
+float positions, half-float positions scaled back by the mesh bounds, and the fallback
+when the bounds are missing.
+
+With arguments it also checks parity against cgf-converter output for a real part:
+    python dev_scripts/test_chunk_geometry.py <part.cgf> <part.cgfm | -> <converted part.dae>
+(extract the part and its companion from Data.p4k, convert it with -dae -notex).
+"""
+import struct
+import sys
+from pathlib import Path
+sys.path.insert(0, ".")
+
+import numpy as np
+import trimesh
+
+from backend.chunk_geometry import (decode_chunk_geometry, CHUNK_MESH, CHUNK_NODE, CHUNK_DATA_STREAM,
+                                    STREAM_POSITIONS, STREAM_INDICES, STREAM_VERTS_UVS)
+from backend.dae_reader import load_dae_part
+
+NODE_ID, MESH_ID, POSITIONS_ID, INDICES_ID = 1, 2, 3, 4
+
+
+def chunk_file(chunks):
+    """CrCh 0x746 file bytes from [(type, version, id, payload)]"""
+    table_offset = 16
+    offset = table_offset + 16 * len(chunks)
+    table, body = b"", b""
+    for chunk_type, version, chunk_id, payload in chunks:
+        table += struct.pack("<HHIII", chunk_type, version, chunk_id, len(payload), offset + len(body))
+        body += payload
+    return b"CrCh" + struct.pack("<III", 0x746, len(chunks), table_offset) + table + body
+
+
+def node_chunk(name, mesh_id, translation):
+    matrix = np.eye(4)
+    matrix[3, :3] = translation     # Row-vector matrix: translation in the last row
+    payload = name.encode().ljust(64, b"\0") + struct.pack("<II", mesh_id, 0xFFFFFFFF)
+    payload = payload.ljust(84, b"\0") + struct.pack("<16f", *matrix.ravel())
+    return payload.ljust(200, b"\0")
+
+
+def mesh_chunk(n_verts, n_indices, position_type, bounds=None):
+    ids = [0] * 16
+    ids[position_type] = POSITIONS_ID
+    ids[STREAM_INDICES] = INDICES_ID
+    payload = struct.pack("<iiii", 0, 0, n_verts, n_indices).ljust(28, b"\0")
+    payload += struct.pack("<16i", *ids) + b"\0" * 16
+    if bounds is not None:
+        payload += struct.pack("<6f", *bounds[0], *bounds[1])
+    return payload
+
+
+def stream_chunk(stream_type, values: np.ndarray):
+    element_size = values.itemsize * (values.shape[1] if values.ndim > 1 else 1)
+    header = struct.pack("<iiii", 0, stream_type, len(values), element_size).ljust(24, b"\0")
+    return header + values.tobytes()
+
+
+def part(vertices, faces, position_type, position_values, bounds=None, translation=(0, 0, 0)):
+    return chunk_file([
+        (CHUNK_NODE, 0x823, NODE_ID, node_chunk("part", MESH_ID, translation)),
+        (CHUNK_MESH, 0x801, MESH_ID, mesh_chunk(len(vertices), faces.size, position_type, bounds)),
+        (CHUNK_DATA_STREAM, 0x800, POSITIONS_ID, stream_chunk(position_type, position_values)),
+        (CHUNK_DATA_STREAM, 0x800, INDICES_ID, stream_chunk(STREAM_INDICES, faces.astype("<u2").ravel())),
+    ])
+
+
+def synthetic_checks():
+    box = trimesh.creation.box(extents=(4.0, 8.0, 3.0))
+    box.apply_translation((1.0, 0.0, 5.0))
+    vertices, faces = box.vertices.astype(np.float32), box.faces
+
+    # 1. Float positions, placed by the node matrix
+    data = part(vertices, faces, STREAM_POSITIONS, vertices.astype("<f4"), translation=(10, 20, 30))
+    got, got_faces = decode_chunk_geometry(data).combined()
+    assert np.allclose(got, vertices + (10, 20, 30), atol=1e-5) and np.array_equal(got_faces, faces)
+    print("[OK] float positions decoded and placed")
+
+    # 2. Half-float packed positions are stored relative to the mesh bounds
+    lower, upper = box.bounds
+    scale, center = np.maximum((upper - lower) / 2, 1.0), (lower + upper) / 2
+    packed = np.zeros((len(vertices), 8), dtype="<f2")     # P3S_C4B_T2S: position, color, UV
+    packed[:, :3] = (vertices - center) / scale
+    data = part(vertices, faces, STREAM_VERTS_UVS, packed, bounds=(lower, upper))
+    got, _ = decode_chunk_geometry(data).combined()
+    assert np.allclose(got, vertices, atol=1e-2), np.abs(got - vertices).max()
+    print(f"[OK] half-float positions scaled back to the bounds (max error {np.abs(got - vertices).max():.4f})")
+
+    # 3. Without bounds they can't be placed: the decoder declines, the converter takes over
+    data = part(vertices, faces, STREAM_VERTS_UVS, packed)
+    assert decode_chunk_geometry(data) is None
+    print("[OK] half-float positions without bounds fall back to the converter")
+
+
+def parity_check(geometry: Path, companion: str, dae: Path):
+    companion_bytes = None if companion == "-" else Path(companion).read_bytes()
+    scene = decode_chunk_geometry(geometry.read_bytes(), companion_bytes)
+    assert scene is not None, "decoder declined the part (it would go through the converter)"
+    vertices, faces = scene.combined()
+    expected, expected_faces = load_dae_part(dae).combined()
+    assert len(faces) == len(expected_faces), f"{len(faces)} faces, converter {len(expected_faces)}"
+    lower, upper = vertices.min(axis=0), vertices.max(axis=0)
+    expected_lower, expected_upper = expected.min(axis=0), expected.max(axis=0)
+    tolerance = 1e-3 * max(float(np.linalg.norm(expected_upper - expected_lower)), 1.0)
+    assert np.allclose(lower, expected_lower, atol=tolerance) and np.allclose(upper, expected_upper, atol=tolerance), \
+        f"bounds {lower}..{upper}, converter {expected_lower}..{expected_upper}"
+    volume = trimesh.Trimesh(vertices, faces, process=False).volume
+    expected_volume = trimesh.Trimesh(expected, expected_faces, process=False).volume
+    print(f"[OK] parity with {dae.name}: {len(faces)} faces, bounds match, volume {volume:.4f} vs {expected_volume:.4f}")
+
+
+def main():
+    synthetic_checks()
+    if len(sys.argv) == 4:
+        parity_check(Path(sys.argv[1]), sys.argv[2], Path(sys.argv[3]))
+    else:
+        print("(no part given: skipping the parity check against converter output)")
+    print("All chunk geometry checks passed")
+
+
+if __name__ == "__main__":
+    main()
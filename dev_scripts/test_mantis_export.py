@@ -19,25 +19,15 @@ async def test_mantis_export():
     
     # Find Mantis
     test_ship = "RSI_Mantis"
-    ship_record = None
-    for records in manager._records_by_path.values():
-        for r in records:
-            if r.name == test_ship:
-                ship_record = r
-                break
-        if ship_record:
-            break
+    ship_record = manager.get_record_by_name(test_ship)
     
     if not ship_record:
         # Try searching
         print(f"Exact match not found, searching for Mantis...")
-        for records in manager._records_by_path.values():
-            for r in records:
-                if "mantis" in r.name.lower():
-                    print(f"  Found: {r.name}")
-                    ship_record = r
-                    break
-            if ship_record:
+        for e in manager._entries_by_guid.values():
+            if "mantis" in e.name.lower():
+                print(f"  Found: {e.name}")
+                ship_record = manager.get_record_by_guid(e.guid)
                 break
     
     if not ship_record:
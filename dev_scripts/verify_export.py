@@ -21,14 +21,14 @@ if __name__ == "__main__":
     print("Listing Candidates for Verification...")
     
     match_count = 0
-    for r in manager._records_by_guid.values():
+    for r in manager._entries_by_guid.values():
         name_lower = r.name.lower()
         if "rifle" in name_lower and "behr" in name_lower and match_count < 10:
             print(f"Rifle Candidate: {r.name}")
             match_count += 1
             
     match_count = 0
-    for r in manager._records_by_guid.values():
+    for r in manager._entries_by_guid.values():
         name_lower = r.name.lower()
         if "helmet" in name_lower and "cds" in name_lower and match_count < 10:
              print(f"Helmet Candidate: {r.name}")
@@ -10,11 +10,7 @@ async def test():
     # 1. Test Thumbnail Extraction
     print("\n--- Testing Thumbnail Extraction ---")
     # Find Arrow
-    arrow = None
-    for r in manager._records_by_guid.values():
-        if r.name == "ANVL_Arrow":
-            arrow = r
-            break
+    arrow = manager.get_record_by_name("ANVL_Arrow")
             
     if arrow:
         print(f"Found Arrow: {arrow.id}")
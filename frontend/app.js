@@ -14,6 +14,7 @@ const previewPanel = document.getElementById('preview-panel');
 const previewTitle = document.getElementById('preview-title');
 const searchInput = document.getElementById('search-input');
 const btnExport = document.getElementById('btn-export');
+const exportFormat = document.getElementById('export-format');
 
 // State
 let categories = [];
@@ -30,6 +31,11 @@ async function init() {
         if (status.configured) {
             showMainScreen();
             loadCategories();
+        } else if (status.loading) {
+            // A load started earlier (e.g. before a page refresh) is still running
+            showSetupScreen();
+            btnSetPath.disabled = true;
+            await waitForLoad();
         } else {
             showSetupScreen();
         }
@@ -39,6 +45,45 @@ async function init() {
     }
 }
 
+const LOAD_PHASE_LABELS = {
+    p4k_open: 'OPENING P4K',
+    datacore_parse: 'PARSING DATACORE',
+    localization: 'LOADING LOCALIZATION',
+    index_build: 'BUILDING INDEX',
+};
+
+// Poll /api/status until the background game load finishes
+async function waitForLoad() {
+    while (true) {
+        let status;
+        try {
+            const response = await fetch('/api/status');
+            status = await response.json();
+        } catch (e) {
+            console.error('Status poll failed:', e);
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            continue;
+        }
+
+        const load = status.load || {};
+        if (status.configured) {
+            showMainScreen();
+            loadCategories();
+            return;
+        }
+        if (load.state === 'failed' || (!status.loading && load.state !== 'loading')) {
+            setupError.textContent = load.error || 'Failed to load game data';
+            btnSetPath.innerHTML = '<i class="fa-solid fa-link"></i> CONNECT INTERFACE';
+            btnSetPath.disabled = false;
+            return;
+        }
+
+        const label = LOAD_PHASE_LABELS[load.phase] || 'INITIALIZING';
+        btnSetPath.innerHTML = `<i class="fa-solid fa-spinner fa-spin"></i> ${label}... ${load.percent || 0}%`;
+        await new Promise(resolve => setTimeout(resolve, 500));
+    }
+}
+
 function showSetupScreen() {
     if (setupScreen) setupScreen.style.display = 'flex';
     if (mainScreen) mainScreen.classList.add('hidden');
@@ -77,8 +122,7 @@ if (btnSetPath) {
                 return;
             }
 
-            showMainScreen();
-            loadCategories();
+            await waitForLoad();
         } catch (e) {
             console.error('Connection error:', e);
             setupError.textContent = 'Connection error - Is the server running?';
@@ -197,25 +241,31 @@ function renderCategoryTree(cats, container) {
     }
 }
 
-// Load Items
-async function loadItems(path) {
+// Load Items (one page at a time; offset > 0 appends to the grid)
+async function loadItems(path, offset = 0) {
     currentPath = path;
 
     const gridContainer = document.querySelector('.grid-container');
     if (!gridContainer) return;
 
-    gridContainer.innerHTML = '<p class="placeholder-msg">Loading...</p>';
+    if (offset === 0) {
+        gridContainer.innerHTML = '<p class="placeholder-msg">Loading...</p>';
+    }
 
     try {
-        const response = await fetch(`/api/items/${encodeURIComponent(path)}`);
+        const response = await fetch(`/api/items/${encodeURIComponent(path)}?offset=${offset}`);
         const data = await response.json();
 
-        if (!data.items || data.items.length === 0) {
+        // Ignore stale pages if the user switched category meanwhile
+        if (currentPath !== path) return;
+
+        if (offset === 0 && (!data.items || data.items.length === 0)) {
             gridContainer.innerHTML = '<p class="placeholder-msg">No items found in this category.</p>';
             return;
         }
 
-        gridContainer.innerHTML = '';
+        if (offset === 0) gridContainer.innerHTML = '';
+        removeLoadMore(gridContainer);
 
         for (const item of data.items) {
             const card = document.createElement('div');
@@ -238,12 +288,36 @@ async function loadItems(path) {
             card.addEventListener('click', () => selectItem(item));
             gridContainer.appendChild(card);
         }
+
+        if (data.next_offset !== null && data.next_offset !== undefined) {
+            appendLoadMore(gridContainer, data.next_offset, data.total, () => loadItems(path, data.next_offset));
+        }
     } catch (e) {
         console.error('Failed to load items:', e);
-        gridContainer.innerHTML = '<p class="placeholder-msg">Error loading items.</p>';
+        if (offset === 0) {
+            gridContainer.innerHTML = '<p class="placeholder-msg">Error loading items.</p>';
+        }
     }
 }
 
+// "Load more" button at the end of a paged grid
+function appendLoadMore(container, shown, total, onClick) {
+    const btn = document.createElement('button');
+    btn.className = 'load-more-btn';
+    btn.innerHTML = `<i class="fa-solid fa-angles-down"></i> LOAD MORE (${shown} / ${total})`;
+    btn.addEventListener('click', () => {
+        btn.disabled = true;
+        btn.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i> LOADING...';
+        onClick();
+    });
+    container.appendChild(btn);
+}
+
+function removeLoadMore(container) {
+    const btn = container.querySelector('.load-more-btn');
+    if (btn) btn.remove();
+}
+
 // Select Item
 function selectItem(item) {
     if (previewPanel) previewPanel.classList.remove('hidden');
@@ -262,39 +336,48 @@ if (searchInput) {
         clearTimeout(searchTimeout);
         if (query.length < 2) return;
 
-        searchTimeout = setTimeout(async () => {
-            try {
-                const response = await fetch(`/api/search?q=${encodeURIComponent(query)}`);
-                const data = await response.json();
-
-                const gridContainer = document.querySelector('.grid-container');
-                if (!gridContainer) return;
-
-                if (data.results && data.results.length > 0) {
-                    gridContainer.innerHTML = '';
-                    for (const item of data.results) {
-                        const card = document.createElement('div');
-                        card.className = 'item-card';
-                        card.innerHTML = `
-                            <div class="card-swatch"><i class="fa-solid fa-cube"></i></div>
-                            <div class="card-footer">
-                                <div class="item-name">${item.name}</div>
-                                <div class="item-code">${item.type || ''}</div>
-                            </div>
-                        `;
-                        card.addEventListener('click', () => selectItem(item));
-                        gridContainer.appendChild(card);
-                    }
-                } else {
-                    gridContainer.innerHTML = '<p class="placeholder-msg">No results found.</p>';
-                }
-            } catch (e) {
-                console.error('Search error:', e);
-            }
-        }, 300);
+        searchTimeout = setTimeout(() => runSearch(query), 300);
     });
 }
 
+async function runSearch(query, offset = 0) {
+    try {
+        const response = await fetch(`/api/search?q=${encodeURIComponent(query)}&offset=${offset}`);
+        const data = await response.json();
+
+        const gridContainer = document.querySelector('.grid-container');
+        if (!gridContainer) return;
+
+        // Ignore stale pages if the query changed meanwhile
+        if (searchInput.value.trim() !== query) return;
+
+        if (data.results && data.results.length > 0) {
+            if (offset === 0) gridContainer.innerHTML = '';
+            removeLoadMore(gridContainer);
+            for (const item of data.results) {
+                const card = document.createElement('div');
+                card.className = 'item-card';
+                card.innerHTML = `
+                    <div class="card-swatch"><i class="fa-solid fa-cube"></i></div>
+                    <div class="card-footer">
+                        <div class="item-name">${item.name}</div>
+                        <div class="item-code">${item.type || ''}</div>
+                    </div>
+                `;
+                card.addEventListener('click', () => selectItem(item));
+                gridContainer.appendChild(card);
+            }
+            if (data.next_offset !== null && data.next_offset !== undefined) {
+                appendLoadMore(gridContainer, data.next_offset, data.total, () => runSearch(query, data.next_offset));
+            }
+        } else if (offset === 0) {
+            gridContainer.innerHTML = '<p class="placeholder-msg">No results found.</p>';
+        }
+    } catch (e) {
+        console.error('Search error:', e);
+    }
+}
+
 // Export
 if (btnExport) {
     btnExport.addEventListener('click', async () => {
@@ -308,7 +391,8 @@ if (btnExport) {
         btnExport.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i> EXPORTING...';
 
         try {
-            const response = await fetch(`/api/export/${encodeURIComponent(item.id)}`);
+            const format = exportFormat ? exportFormat.value : 'obj';
+            const response = await fetch(`/api/export/${encodeURIComponent(item.id)}?format=${encodeURIComponent(format)}`);
             const result = await response.json();
 
             if (!response.ok) {